@@ -0,0 +1,297 @@
+"""
+Time the bot's data layer against a synthetic world.
+
+Every public function in bot/data, util/player.py, util/format.format_id
+and the embed builders in embeds.py is timed twice: cold, right after the
+world's files are touched so every file version cache is invalidated,
+and warm, with those caches in place. Results are written as JSON so runs
+can be compared over time.
+
+Usage: python3 bench/data_layer.py [--players N] [--bounties N] [--repeat N]
+                                   [--world DIRECTORY] [--output FILE]
+"""
+
+# Other imports
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIRECTORY: str = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIRECTORY, "..", "bot"))
+
+# Project imports
+from world import generate_world, ITEMS
+
+
+def touch_world(directory: str) -> None:
+    """
+    Bump the mtime of every file the data layer caches, so the
+    next calls see new file versions and rebuild from disk.
+    """
+
+    now: int = time.time_ns()
+
+    for sub_directory in ("playerSnapshots", os.path.join("world", "data"), os.path.join("config", "the_vault", "gear_modifiers")):
+        with os.scandir(os.path.join(directory, sub_directory)) as entries:
+            for entry in entries:
+                os.utime(entry.path, ns=(now, now))
+
+    # the file watcher does this when the bot is running
+    from data.snapshots import SNAPSHOT_INDEX
+    SNAPSHOT_INDEX.invalidate()
+
+
+def get_benchmarks(names: list) -> list:
+    """
+    Return (name, function, cold reset) tuples for every benchmarked call.
+    Cold runs call the reset before timing, on top of touching the world.
+    """
+
+    import data.black_market as black_market
+    import data.bounties as bounties
+    import data.bounty_search as bounty_search
+    import data.crafted_modifiers as crafted_modifiers
+    import data.leaderboard as leaderboard
+    import data.proficiency as proficiency
+    import data.progression as progression
+    import data.server_stats as server_stats
+    import data.snapshots as snapshots
+    import embeds
+    import util.format as format
+    import util.player as player
+    from data.bounty_diff import BountyDiffEngine, get_bounty_fingerprint
+
+    target: str = names[len(names) // 2]
+    group: list = names[::max(len(names) // 50, 1)]
+    item_ids: list = [format.preformat_id(item) for item in ITEMS] * 100
+
+    def format_ids() -> None:
+        for item_id in item_ids:
+            format.format_id(item_id)
+
+    def fingerprint_bounties() -> None:
+        for bounty in bounties.get_player_bounty_data(target):
+            get_bounty_fingerprint(bounty)
+
+    def diff_bounties() -> None:
+        bounty_list: list = bounties.get_player_bounty_data(target)
+        changed_list: list = random.Random(1).sample(bounty_list, len(bounty_list))[1:]
+
+        engine: BountyDiffEngine = BountyDiffEngine()
+        engine.diff(target, bounty_list)
+        engine.diff(target, changed_list)
+
+    def build_bounty_embed() -> None:
+        embeds.get_bounty_embed(f"{target}'s Bounties", bounties.get_player_bounty_data(target), target)
+
+    def build_proficiency_embed() -> None:
+        embeds.get_player_prof_embed(f"{target}'s Proficiencies", target, proficiency.get_player_proficiency_data(target))
+
+    def build_vault_stats_embed() -> None:
+        stats: dict = snapshots.SNAPSHOT_INDEX.get_snapshot(target)
+        embeds.get_vault_stats_embed(f"{target} - Level {stats['vaultLevel']}", target, {
+            "total": stats["completed"] + stats["survived"] + stats["failed"],
+            "completed": stats["completed"],
+            "survived": stats["survived"],
+            "failed": stats["failed"]
+        })
+
+    def find_bounties() -> None:
+        bounty_search.find_bounties(bounty_search.get_bounty_search_names("reward", "")[0])
+
+    def build_bounty_search_embed() -> None:
+        reward: str = bounty_search.get_bounty_search_names("reward", "")[0]
+        embeds.get_bounty_search_embed(f"Bounties rewarding {reward}", bounty_search.find_bounties(reward))
+
+    def get_leaderboard_pages() -> None:
+        for metric in ("vaultLevel", "proficiency.sword"):
+            leaderboard.LEADERBOARD.get_page(metric, 1)
+
+    def build_leaderboard_embed() -> None:
+        rows, page_count = leaderboard.LEADERBOARD.get_page("vaultLevel", 1)
+        rows = [(rank, name, leaderboard.format_metric_value("vaultLevel", value)) for rank, name, value in rows]
+
+        embeds.get_leaderboard_embed(leaderboard.METRICS["vaultLevel"], rows, 1, page_count)
+
+    def build_server_stats_embed() -> None:
+        embeds.get_server_stats_embed(server_stats.SERVER_STATS.get_stats())
+
+    def find_black_market_offers() -> None:
+        black_market.find_black_market_offers(black_market.get_black_market_item_names("")[0])
+
+    def build_black_market_offers_embed() -> None:
+        item: str = black_market.get_black_market_item_names("")[0]
+        offers, omitted_items = black_market.find_black_market_offers(item)
+
+        embeds.get_black_market_offers_embed(item, offers, omitted_items)
+
+    def get_players_without_research() -> None:
+        progression.get_players_without_research(progression.get_research_names("")[0])
+
+    def build_compare_embed() -> None:
+        missing, comparison = progression.compare_players(group[:4])
+        embeds.get_compare_embed(group[:4], comparison)
+
+    def build_missing_research_embed() -> None:
+        research: str = progression.get_research_names("")[0]
+        players: list = progression.get_players_without_research(research)
+
+        embeds.get_players_embed(embeds.PlayerListOptions.MISSING_RESEARCH, players, research)
+
+    def no_reset() -> None:
+        pass
+
+    return [
+        ("bounties.get_bounty_player_order", bounties.get_bounty_player_order, no_reset),
+        ("bounties.decode_all_bounties", bounties.decode_all_bounties, no_reset),
+        ("bounties.get_all_bounty_data", bounties.get_all_bounty_data, no_reset),
+        ("bounties.get_player_bounty_data", lambda: bounties.get_player_bounty_data(target), no_reset),
+        ("bounties.get_players_bounty_data", lambda: bounties.get_players_bounty_data(group), no_reset),
+        ("bounty_search.find_bounties", find_bounties, no_reset),
+        ("bounty_search.get_bounty_search_names", lambda: bounty_search.get_bounty_search_names("task", "m"), no_reset),
+        ("black_market.get_black_market_player_order", black_market.get_black_market_player_order, no_reset),
+        ("black_market.get_black_market_positions", black_market.get_black_market_positions, no_reset),
+        ("black_market.get_all_black_market_data", black_market.get_all_black_market_data, no_reset),
+        ("black_market.get_player_black_market_data", lambda: black_market.get_player_black_market_data(target), no_reset),
+        ("leaderboard.LEADERBOARD.get_page", get_leaderboard_pages, no_reset),
+        ("leaderboard.format_metric_value", lambda: leaderboard.format_metric_value("proficiency.sword", 1234), no_reset),
+        ("server_stats.SERVER_STATS.get_stats", server_stats.SERVER_STATS.get_stats, no_reset),
+        ("black_market.get_black_market_item_index", black_market.get_black_market_item_index, no_reset),
+        ("black_market.get_black_market_item_names", lambda: black_market.get_black_market_item_names("i"), no_reset),
+        ("black_market.find_black_market_offers", find_black_market_offers, no_reset),
+        ("progression.compare_players", lambda: progression.compare_players(group[:4]), no_reset),
+        ("progression.get_players_without_research", get_players_without_research, no_reset),
+        ("progression.get_research_names", lambda: progression.get_research_names("a"), no_reset),
+        ("crafted_modifiers.get_gear_modifiers_signature", crafted_modifiers.get_gear_modifiers_signature, no_reset),
+        ("crafted_modifiers.build_gear_modifier_catalogue", crafted_modifiers.build_gear_modifier_catalogue, no_reset),
+        ("crafted_modifiers.get_gear_modifier_catalogue", crafted_modifiers.get_gear_modifier_catalogue, no_reset),
+        ("crafted_modifiers.get_crafted_modifiers_data", crafted_modifiers.get_crafted_modifiers_data, no_reset),
+        ("crafted_modifiers.get_crafted_modifiers", lambda: crafted_modifiers.get_crafted_modifiers(target), no_reset),
+        ("proficiency.get_player_proficiency_data", lambda: proficiency.get_player_proficiency_data(target), no_reset),
+        ("snapshots.get_player_snapshots", snapshots.get_player_snapshots, no_reset),
+        ("snapshots.SNAPSHOT_INDEX.get_snapshot", lambda: snapshots.SNAPSHOT_INDEX.get_snapshot(target), no_reset),
+        ("bounty_diff.get_bounty_fingerprint", fingerprint_bounties, no_reset),
+        ("bounty_diff.BountyDiffEngine.diff", diff_bounties, no_reset),
+        ("player.get_uuid_from_username", lambda: player.get_uuid_from_username(target), no_reset),
+        ("player.get_uuid_username_dict", player.get_uuid_username_dict, no_reset),
+        ("format.format_id", format_ids, format.reload_lang_files),
+        ("embeds.get_bounty_embed", build_bounty_embed, no_reset),
+        ("embeds.get_player_prof_embed", build_proficiency_embed, no_reset),
+        ("embeds.get_vault_stats_embed", build_vault_stats_embed, no_reset),
+        ("embeds.get_leaderboard_embed", build_leaderboard_embed, no_reset),
+        ("embeds.get_server_stats_embed", build_server_stats_embed, no_reset),
+        ("embeds.get_black_market_offers_embed", build_black_market_offers_embed, no_reset),
+        ("embeds.get_bounty_search_embed", build_bounty_search_embed, no_reset),
+        ("embeds.get_compare_embed", build_compare_embed, no_reset),
+        ("embeds.get_players_embed (missing research)", build_missing_research_embed, no_reset),
+        ("embeds.get_players_embed", lambda: embeds.get_players_embed(embeds.PlayerListOptions.ONLINE, group), no_reset)
+    ]
+
+
+def summarize(timings: list) -> dict:
+    return {
+        "min_ms": round(min(timings) / 1e6, 4),
+        "median_ms": round(statistics.median(timings) / 1e6, 4),
+        "mean_ms": round(statistics.mean(timings) / 1e6, 4),
+        "runs": len(timings)
+    }
+
+
+def run_benchmarks(directory: str, names: list, repeat: int) -> dict:
+    """
+    Return the cold and warm timings of every benchmark, in milliseconds.
+    """
+
+    results: dict = {}
+
+    for name, function, reset in get_benchmarks(names):
+        cold: list = []
+        warm: list = []
+
+        for _ in range(repeat):
+            touch_world(directory)
+            reset()
+
+            start: int = time.perf_counter_ns()
+            function()
+            cold.append(time.perf_counter_ns() - start)
+
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            function()
+            warm.append(time.perf_counter_ns() - start)
+
+        results[name] = {"cold": summarize(cold), "warm": summarize(warm)}
+
+    return results
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BENCH_DIRECTORY,
+                              capture_output=True, text=True, check=True).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark the bot's data layer.")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--bounties", type=int, default=5, help="most bounties per player in each availability")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--world", help="directory to generate the world in, instead of a temporary one")
+    parser.add_argument("--output", help="file to write JSON results to, instead of stdout")
+
+    args: argparse.Namespace = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        directory: str = args.world or stack.enter_context(tempfile.TemporaryDirectory())
+        directory = os.path.abspath(directory)
+
+        names: list = generate_world(directory, args.players, args.bounties, args.seed)
+
+        # the data layer reads everything relative to the server directory
+        os.chdir(directory)
+
+        # some data functions print debug output
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results: dict = run_benchmarks(directory, names, args.repeat)
+
+    report: dict = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "players": args.players,
+            "bounties": args.bounties,
+            "repeat": args.repeat,
+            "seed": args.seed
+        },
+        "results": results
+    }
+
+    for name, timings in results.items():
+        print(f"{name:<52}cold {timings['cold']['median_ms']:>10.3f} ms   warm {timings['warm']['median_ms']:>10.3f} ms", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    else:
+        print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
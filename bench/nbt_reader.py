@@ -0,0 +1,179 @@
+"""
+Benchmark the lazy NBT reader in util/nbt.py against python_nbt
+on a synthetic Bounties.dat.
+
+Usage: python3 bench/nbt_reader.py [players] [bounties per player]
+"""
+
+# Other imports
+import os
+import sys
+import random
+import tempfile
+import time
+import uuid as uuid_lib
+
+import python_nbt.nbt as python_nbt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bot"))
+
+# Project imports
+import util.nbt as nbt
+
+
+AVAILABILITIES: tuple = ("legendary", "active", "available", "complete")
+ITEMS: tuple = (
+    "minecraft:diamond",
+    "minecraft:elytra",
+    "minecraft:netherite_ingot",
+    "minecraft:shulker_shell",
+    "the_vault:gem_pog"
+)
+
+
+def compound(**tags) -> python_nbt.NBTTagCompound:
+    tag = python_nbt.NBTTagCompound()
+
+    for key, value in tags.items():
+        tag[key] = value
+
+    return tag
+
+
+def tag_list(tags: list, tag_type) -> python_nbt.NBTTagList:
+    tag = python_nbt.NBTTagList(tag_type=tag_type)
+
+    for value in tags:
+        tag.append(value)
+
+    return tag
+
+
+def write_bounties_file(path: str, players: int, bounties: int, seed: int = 1) -> list:
+    """
+    Write a Bounties.dat with the given number of players and
+    bounties per player in each availability, returning the
+    players' UUIDs.
+    """
+
+    rand: random.Random = random.Random(seed)
+    uuids: list = [str(uuid_lib.UUID(int=rand.getrandbits(128))) for _ in range(players)]
+
+    data = compound()
+
+    for availability in AVAILABILITIES:
+        player_bounties = compound()
+
+        for uuid in uuids:
+            bounty_list: list = []
+
+            for i in range(bounties):
+                properties = compound(
+                    taskType=python_nbt.NBTTagString("the_vault:item_discovery"),
+                    amount=python_nbt.NBTTagDouble(float(rand.randint(1, 64))),
+                    itemId=python_nbt.NBTTagString(rand.choice(ITEMS))
+                )
+
+                items = tag_list([
+                    compound(stack=compound(
+                        id=python_nbt.NBTTagString(rand.choice(ITEMS)),
+                        Count=python_nbt.NBTTagByte(rand.randint(1, 64))
+                    ))
+                    for _ in range(3)
+                ], python_nbt.NBTTagCompound)
+
+                bounty_list.append(compound(
+                    id=python_nbt.NBTTagIntArray([rand.randint(-2**31, 2**31 - 1) for _ in range(4)]),
+                    task=compound(
+                        properties=properties,
+                        amountObtained=python_nbt.NBTTagDouble(0.0),
+                        reward=compound(items=items, vaultExp=python_nbt.NBTTagInt(rand.randint(1, 500)))
+                    ),
+                    expiration=python_nbt.NBTTagLong(1680000000000 + i)
+                ))
+
+            player_bounties[uuid] = tag_list(bounty_list, python_nbt.NBTTagCompound)
+
+        data[availability] = player_bounties
+
+    python_nbt.write_to_nbt_file(path, compound(data=data))
+
+    return uuids
+
+
+def get_player_bounties(tree, uuid: str) -> list:
+    """
+    Walk one player's bounties the way data/bounties.py does.
+    """
+
+    result: list = []
+
+    for availability in AVAILABILITIES:
+        for bounty in tree["data"][availability][uuid].value:
+            task = bounty["task"]
+
+            result.append((
+                task["properties"]["itemId"].value,
+                task["properties"]["amount"].value,
+                [reward["stack"]["id"].value for reward in task["reward"]["items"].value],
+                bounty["expiration"].value
+            ))
+
+    return result
+
+
+def time_call(func, repeat: int = 3) -> float:
+    """
+    Return the best wall time of func over repeat runs, in milliseconds.
+    """
+
+    best: float = float("inf")
+
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000
+
+
+def main() -> None:
+    players: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    bounties: int = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as directory:
+        path: str = os.path.join(directory, "the_vault_Bounties.dat")
+        uuids: list = write_bounties_file(path, players, bounties)
+        target: str = uuids[len(uuids) // 2]
+
+        lazy_tree = nbt.read_lazy_nbt(path)
+        if get_player_bounties(lazy_tree, target) != get_player_bounties(python_nbt.read_from_nbt_file(path), target):
+            raise SystemExit("Readers disagree on the player's bounties")
+
+        print(f"{players} players, {bounties} bounties each per availability, "
+              f"{os.path.getsize(path) / 1e6:.2f} MB compressed, "
+              f"{len(lazy_tree._buffer) / 1e6:.2f} MB decompressed")
+
+        def lazy_all() -> None:
+            tree = nbt.read_lazy_nbt(path)
+
+            for uuid in uuids:
+                get_player_bounties(tree, uuid)
+
+        results: dict = {
+            "python_nbt, parse": time_call(lambda: python_nbt.read_from_nbt_file(path), repeat=1),
+            "lazy, parse": time_call(lambda: nbt.read_lazy_nbt(path)),
+            "lazy, parse + one player": time_call(lambda: get_player_bounties(nbt.read_lazy_nbt(path), target)),
+            "lazy, parse + every player": time_call(lazy_all, repeat=1)
+        }
+
+        # a cached tree answering another player's lookup
+        get_player_bounties(lazy_tree, uuids[0])
+        results["lazy, cached tree + one player"] = time_call(lambda: get_player_bounties(lazy_tree, uuids[-1]))
+
+        for name, milliseconds in results.items():
+            print(f"{name:<32}{milliseconds:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
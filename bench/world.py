@@ -0,0 +1,343 @@
+"""
+Generate a synthetic Vault Hunters world for benchmarking the bot's data layer.
+
+The world is laid out the way the bot expects to find it when run from the
+server directory: playerSnapshots/*.json, the world/data/the_vault_*.dat files,
+config/the_vault/gear_modifiers/*.json, and eternal-smp-bot/test-eternal-smp-bot
+directories linking to the repository's lang files, with a placeholder head
+render per player so nothing is downloaded.
+
+Usage: python3 bench/world.py <directory> [--players N] [--bounties N] [--seed N]
+"""
+
+# Other imports
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import uuid as uuid_lib
+from struct import pack, unpack
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bot"))
+
+# Project imports
+from util.nbt import (TAG_BYTE, TAG_SHORT, TAG_INT, TAG_LONG, TAG_FLOAT, TAG_DOUBLE, TAG_STRING,
+                      TAG_LIST, TAG_COMPOUND, TAG_INT_ARRAY)
+
+
+REPOSITORY_DIRECTORY: str = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+AVAILABILITIES: tuple = ("legendary", "active", "available", "complete")
+
+ITEMS: tuple = (
+    "minecraft:diamond",
+    "minecraft:emerald",
+    "minecraft:elytra",
+    "minecraft:netherite_ingot",
+    "minecraft:shulker_shell",
+    "minecraft:golden_apple",
+    "minecraft:ender_pearl",
+    "the_vault:vault_diamond",
+    "the_vault:knowledge_star",
+    "the_vault:soul_shard"
+)
+
+ENTITIES: tuple = ("minecraft:zombie", "minecraft:skeleton", "minecraft:creeper", "minecraft:witch")
+BLOCKS: tuple = ("minecraft:stone", "minecraft:diamond_ore", "minecraft:ancient_debris")
+VAULTS: tuple = ("vault", "boss", "cake", "scavenger")
+
+# task type -> (id property, possible ids)
+TASKS: dict = {
+    "the_vault:completion": ("id", VAULTS),
+    "the_vault:item_discovery": ("itemId", ITEMS),
+    "the_vault:item_submission": ("itemId", ITEMS),
+    "the_vault:kill_entity": ("entityId", ENTITIES),
+    "the_vault:mining": ("blockId", BLOCKS)
+}
+
+PROFICIENCIES: tuple = ("helmet", "chestplate", "leggings", "boots", "magnet", "sword", "axe", "shield", "idol")
+GEAR: tuple = ("helmet", "chestplate", "leggings", "boots", "magnet", "sword", "axe", "shield", "idol")
+
+CRAFTED_PREFIXES: tuple = ("the_vault:crafted_health", "the_vault:crafted_armor", "the_vault:crafted_attack_damage",
+                           "the_vault:crafted_cooldown_reduction", "the_vault:crafted_mana_additive")
+CRAFTED_SUFFIXES: tuple = ("the_vault:crafted_soulbound", "the_vault:crafted_item_quantity", "the_vault:crafted_reach")
+
+ABILITIES: tuple = ("Dash", "Mega Jump", "Heal", "Ghost Walk", "Rampage", "Execute", "Nova", "Vein Miner")
+TALENTS: tuple = ("Haste", "Strength", "Speed", "Nimble", "Treasure Hunter", "Lucky Altar", "Wisdom", "Stoneskin")
+RESEARCHES: tuple = ("Botania", "Mekanism", "Create", "Applied Energistics", "Refined Storage", "Thermal",
+                     "Iron Chests", "Sophisticated Backpacks", "Dank Storage", "Powah")
+
+# smallest valid PNG, used as every player's head render
+PLACEHOLDER_PNG: bytes = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+# Tags are written from (type, value) tuples: compounds take a dict of
+# name -> tag, lists take (element type, [values]), and every other tag
+# takes its plain value.
+_NUMBER_FORMATS: dict = {
+    TAG_BYTE: ">b",
+    TAG_SHORT: ">h",
+    TAG_INT: ">i",
+    TAG_LONG: ">q",
+    TAG_FLOAT: ">f",
+    TAG_DOUBLE: ">d"
+}
+
+
+def _write_payload(out: bytearray, tag_type: int, value) -> None:
+    if tag_type in _NUMBER_FORMATS:
+        out += pack(_NUMBER_FORMATS[tag_type], value)
+
+    elif tag_type == TAG_STRING:
+        encoded: bytes = value.encode("utf-8")
+        out += pack(">H", len(encoded))
+        out += encoded
+
+    elif tag_type == TAG_INT_ARRAY:
+        out += pack(f">i{len(value)}i", len(value), *value)
+
+    elif tag_type == TAG_LIST:
+        element_type, elements = value
+        out += pack(">bi", element_type, len(elements))
+
+        for element in elements:
+            _write_payload(out, element_type, element)
+
+    elif tag_type == TAG_COMPOUND:
+        for name, (child_type, child_value) in value.items():
+            encoded: bytes = name.encode("utf-8")
+            out += pack(">bH", child_type, len(encoded))
+            out += encoded
+            _write_payload(out, child_type, child_value)
+
+        out += b"\x00"
+
+    else:
+        raise ValueError(f"Unsupported tag type {tag_type}")
+
+
+def write_nbt_file(path: str, root: dict) -> None:
+    """
+    Write a gzipped NBT file whose unnamed root compound holds the given tags.
+    """
+
+    out: bytearray = bytearray(pack(">bH", TAG_COMPOUND, 0))
+    _write_payload(out, TAG_COMPOUND, root)
+
+    with open(path, "wb") as f:
+        f.write(gzip.compress(bytes(out), compresslevel=1))
+
+
+def _string(value: str) -> tuple:
+    return (TAG_STRING, value)
+
+
+def _compound(**tags) -> tuple:
+    return (TAG_COMPOUND, tags)
+
+
+def _compounds(compounds: list) -> tuple:
+    return (TAG_LIST, (TAG_COMPOUND, [tags for _, tags in compounds]))
+
+
+def make_bounty(rand: random.Random, index: int) -> tuple:
+    task_type: str = rand.choice(tuple(TASKS))
+    id_property, ids = TASKS[task_type]
+    amount: float = float(rand.randint(1, 64))
+
+    rewards: list = [
+        _compound(stack=_compound(id=_string(rand.choice(ITEMS)), Count=(TAG_BYTE, rand.randint(1, 64))))
+        for _ in range(rand.randint(1, 4))
+    ]
+
+    return _compound(
+        id=(TAG_INT_ARRAY, [rand.randint(-2**31, 2**31 - 1) for _ in range(4)]),
+        task=_compound(
+            properties=_compound(**{
+                "taskType": _string(task_type),
+                "amount": (TAG_DOUBLE, amount),
+                id_property: _string(rand.choice(ids))
+            }),
+            amountObtained=(TAG_DOUBLE, float(rand.randint(0, int(amount)))),
+            reward=_compound(items=_compounds(rewards), vaultExp=(TAG_INT, rand.randint(100, 5000)))
+        ),
+        expiration=(TAG_LONG, 1680000000000 + index * 60000)
+    )
+
+
+def write_snapshots(directory: str, rand: random.Random, uuids: list, names: list) -> None:
+    os.makedirs(directory, exist_ok=True)
+
+    for uuid, name in zip(uuids, names):
+        snapshot: dict = {
+            "playerUUID": uuid,
+            "playerNickname": name,
+            "vaultLevel": rand.randint(0, 100),
+            "powerLevel": rand.randint(0, 120),
+            "completed": rand.randint(0, 300),
+            "survived": rand.randint(0, 300),
+            "failed": rand.randint(0, 300),
+            "abilities": {ability: rand.randint(1, 5) for ability in rand.sample(ABILITIES, rand.randint(0, 4))},
+            "talents": {talent: rand.randint(1, 5) for talent in rand.sample(TALENTS, rand.randint(0, 5))},
+            "researches": rand.sample(RESEARCHES, rand.randint(0, len(RESEARCHES)))
+        }
+
+        with open(os.path.join(directory, f"{uuid}.json"), "w") as f:
+            json.dump(snapshot, f)
+
+
+def write_bounties(path: str, rand: random.Random, uuids: list, bounties: int) -> None:
+    data: dict = {}
+
+    for availability in AVAILABILITIES:
+        data[availability] = _compound(**{
+            uuid: _compounds([make_bounty(rand, i) for i in range(rand.randint(0, bounties))])
+            for uuid in uuids
+        })
+
+    write_nbt_file(path, {"data": _compound(**data)})
+
+
+def write_black_market(path: str, rand: random.Random, uuids: list) -> None:
+    entries: list = []
+
+    for i in range(len(uuids)):
+        trades: list = [
+            _compound(trade=_compound(
+                stack=_compound(id=_string(rand.choice(ITEMS)), Count=(TAG_BYTE, rand.randint(1, 64))),
+                cost=(TAG_INT, rand.randint(1, 2000))
+            ))
+            for _ in range(3)
+        ]
+
+        entries.append(_compound(nextReset=(TAG_LONG, 1680000000000 + i * 1000), trades=_compounds(trades)))
+
+    write_nbt_file(path, {"data": _compound(
+        playerList=(TAG_LIST, (TAG_STRING, list(uuids))),
+        blackMarketList=_compounds(entries)
+    )})
+
+
+def write_proficiencies(path: str, rand: random.Random, uuids: list) -> None:
+    write_nbt_file(path, {"data": _compound(**{
+        uuid: _compound(**{
+            proficiency: (TAG_INT, rand.randint(0, 10000))
+            for proficiency in rand.sample(PROFICIENCIES, rand.randint(1, len(PROFICIENCIES)))
+        })
+        for uuid in uuids
+    })})
+
+
+def write_crafted_modifiers(path: str, rand: random.Random, uuids: list) -> None:
+    crafts: list = []
+
+    for uuid in uuids:
+        item_crafts: dict = {}
+
+        for gear in rand.sample(GEAR, rand.randint(0, 4)):
+            modifiers: list = [
+                f"{modifier}_t{rand.randint(0, 2)}"
+                for modifier in rand.sample(CRAFTED_PREFIXES + CRAFTED_SUFFIXES, rand.randint(1, 4))
+            ]
+            item_crafts[f"the_vault:{gear}"] = (TAG_LIST, (TAG_STRING, modifiers))
+
+        crafts.append(_compound(
+            player=(TAG_INT_ARRAY, list(unpack(">4i", uuid_lib.UUID(uuid).bytes))),
+            itemCrafts=(TAG_COMPOUND, item_crafts)
+        ))
+
+    write_nbt_file(path, {"data": _compound(crafts=_compounds(crafts))})
+
+
+def write_gear_modifiers(directory: str, rand: random.Random) -> None:
+    os.makedirs(directory, exist_ok=True)
+
+    for gear in GEAR:
+        groups: dict = {}
+
+        for group, identifiers in (("CRAFTED_PREFIX", CRAFTED_PREFIXES), ("CRAFTED_SUFFIX", CRAFTED_SUFFIXES)):
+            groups[group] = []
+
+            for identifier in identifiers:
+                tiers: list = []
+
+                for tier in range(3):
+                    if "soulbound" in identifier:
+                        tiers.append({"value": {}})
+
+                    # some modifiers roll whole numbers, others fractions shown as percentages
+                    elif rand.random() < 0.5:
+                        tiers.append({"value": {"min": tier + 1, "max": tier + 3}})
+
+                    else:
+                        tiers.append({"value": {"min": round(0.01 * (tier + 1), 2), "max": round(0.02 * (tier + 1), 2)}})
+
+                groups[group].append({"identifier": identifier, "tiers": tiers})
+
+        with open(os.path.join(directory, f"{gear}.json"), "w") as f:
+            json.dump({"modifierGroup": groups}, f)
+
+
+def write_bot_directories(directory: str, uuids: list) -> None:
+    """
+    Create the bot directories the data layer reads lang files and head renders from.
+    """
+
+    for bot_directory in ("eternal-smp-bot", "test-eternal-smp-bot"):
+        heads_directory: str = os.path.join(directory, bot_directory, "images", "heads")
+        os.makedirs(heads_directory, exist_ok=True)
+
+        lang_link: str = os.path.join(directory, bot_directory, "lang")
+        if not os.path.lexists(lang_link):
+            os.symlink(os.path.join(REPOSITORY_DIRECTORY, "lang"), lang_link)
+
+        for uuid in uuids:
+            with open(os.path.join(heads_directory, f"{uuid}.png"), "wb") as f:
+                f.write(PLACEHOLDER_PNG)
+
+
+def generate_world(directory: str, players: int = 100, bounties: int = 5, seed: int = 1) -> list:
+    """
+    Write a synthetic world with the given number of players, each having
+    up to the given number of bounties per availability, and return the
+    players' names.
+    """
+
+    rand: random.Random = random.Random(seed)
+
+    uuids: list = [str(uuid_lib.UUID(int=rand.getrandbits(128), version=4)) for _ in range(players)]
+    names: list = [f"Player{i}" for i in range(players)]
+
+    data_directory: str = os.path.join(directory, "world", "data")
+    os.makedirs(data_directory, exist_ok=True)
+
+    write_snapshots(os.path.join(directory, "playerSnapshots"), rand, uuids, names)
+    write_bounties(os.path.join(data_directory, "the_vault_Bounties.dat"), rand, uuids, bounties)
+    write_black_market(os.path.join(data_directory, "the_vault_PlayerBlackMarket.dat"), rand, uuids)
+    write_proficiencies(os.path.join(data_directory, "the_vault_PlayerProficiency.dat"), rand, uuids)
+    write_crafted_modifiers(os.path.join(data_directory, "the_vault_DiscoveredWorkbenchModifiers.dat"), rand, uuids)
+    write_gear_modifiers(os.path.join(directory, "config", "the_vault", "gear_modifiers"), rand)
+    write_bot_directories(directory, uuids)
+
+    return names
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Generate a synthetic Vault Hunters world.")
+    parser.add_argument("directory")
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--bounties", type=int, default=5, help="most bounties per player in each availability")
+    parser.add_argument("--seed", type=int, default=1)
+
+    args: argparse.Namespace = parser.parse_args()
+
+    generate_world(args.directory, args.players, args.bounties, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,79 @@
+# Project imports
+import util.format as format
+import util.nbt as nbt
+from main import TIMING_PROMETHEUS_FILE
+from util.errors import print_command_error
+from util.singleflight import SINGLE_FLIGHT
+from util.timing import TIMINGS
+from util.views import VIEW_CACHE
+from util.worker import get_pool_stats
+
+# Other imports
+import time
 import traceback
 
 import discord
 from discord import ApplicationContext
 
 from discord.commands import slash_command
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 
 class Admin(commands.Cog):
     def __init__(self, bot: discord.Bot) -> None:
         self.bot: discord.Bot = bot
 
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if TIMINGS.enabled and TIMING_PROMETHEUS_FILE and not self.write_timings.is_running():
+            self.write_timings.start()
+
+    def cog_unload(self):
+        self.write_timings.cancel()
+
+    @commands.Cog.listener()
+    async def on_application_command(self, ctx: ApplicationContext):
+        if TIMINGS.enabled:
+            ctx.timing_start = time.perf_counter() #type: ignore
+
+    @commands.Cog.listener()
+    async def on_application_command_completion(self, ctx: ApplicationContext):
+        """
+        Record how long a command took, from invocation to its last response.
+        """
+
+        if start := getattr(ctx, "timing_start", None):
+            TIMINGS.record(f"command.{ctx.command.qualified_name}", time.perf_counter() - start)
+
+    @commands.Cog.listener()
+    async def on_application_command_error(self, ctx: ApplicationContext, error):
+        """
+        Record how long a failed command took, so slow failures and
+        timeouts show up in its timings too.
+
+        Listening for this event stops the bot's default handler from
+        printing errors, so errors nothing else handled are printed here.
+        """
+
+        if start := getattr(ctx, "timing_start", None):
+            TIMINGS.record(f"command.{ctx.command.qualified_name}", time.perf_counter() - start)
+
+        if ctx.command is not None and ctx.command.has_error_handler():
+            return
+
+        if ctx.cog is not None and ctx.cog.has_error_handler():
+            return
+
+        print_command_error(ctx, error)
+
+    @tasks.loop(seconds=30)
+    async def write_timings(self):
+        """
+        Keep the Prometheus timings file up to date.
+        """
+
+        TIMINGS.write_prometheus_file(TIMING_PROMETHEUS_FILE) #type: ignore
+
     @commands.is_owner()
     @slash_command(name="reload")
     async def reload(self, ctx: ApplicationContext, module: str):
@@ -29,6 +92,84 @@ class Admin(commands.Cog):
         else:  # if module successfully reloaded
             await ctx.respond(f"Reloaded `{module}`!")
 
+    @commands.is_owner()
+    @slash_command(name="timings")
+    async def timings(self, ctx: ApplicationContext):
+        """
+        Admin command to see how long commands, background loops
+        and their stages have recently taken.
+        """
+
+        if not TIMINGS.enabled:
+            await ctx.respond("Timing is disabled! Set `TIMING=TRUE` to enable it.", ephemeral=True)
+            return
+
+        rows: list = TIMINGS.get_report()
+
+        if not rows:
+            await ctx.respond("Nothing has been timed yet!", ephemeral=True)
+            return
+
+        lines: list = [f"{'span':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+
+        for name, count, p50, p95, longest in rows:
+            lines.append(f"{name:<28}{count:>7}{p50:>10.1f}{p95:>10.1f}{longest:>10.1f}")
+
+        report: str = "\n".join(lines)
+
+        # stay within discord's message length limit
+        if len(report) > 1900:
+            report = report[:1900].rsplit("\n", 1)[0] + "\n..."
+
+        await ctx.respond(f"```\n{report}\n```", ephemeral=True)
+
+    @commands.is_owner()
+    @slash_command(name="reload-lang")
+    async def reload_lang(self, ctx: ApplicationContext):
+        """
+        Admin command to pick up changes made to the lang files
+        without restarting the bot.
+        """
+
+        format.reload_lang_files()
+
+        await ctx.respond("Reloaded lang files!")
+
+    @commands.is_owner()
+    @slash_command(name="pool-stats")
+    async def pool_stats(self, ctx: ApplicationContext):
+        """
+        Admin command to see how busy the data worker pool is,
+        including the most commands it has run at once.
+        """
+
+        stats: dict = get_pool_stats()
+        stats_str: str = "\n".join(f"{key}: {value}" for key, value in stats.items())
+
+        await ctx.respond(f"```\n{stats_str}\n```", ephemeral=True)
+
+    @commands.is_owner()
+    @slash_command(name="cache-stats")
+    async def cache_stats(self, ctx: ApplicationContext):
+        """
+        Admin command to see how often world data and formatted
+        player views are served from memory, and how many concurrent
+        lookups shared another's work.
+        """
+
+        sections: dict = {
+            "nbt files": dict(nbt.CACHE_STATS),
+            "player views": VIEW_CACHE.get_stats(),
+            "single flight": SINGLE_FLIGHT.get_stats()
+        }
+
+        stats_str: str = "\n\n".join(
+            f"{section}\n" + "\n".join(f"  {key}: {value}" for key, value in stats.items())
+            for section, stats in sections.items()
+        )
+
+        await ctx.respond(f"```\n{stats_str}\n```", ephemeral=True)
+
 
 def setup(bot: discord.Bot) -> None:
     bot.add_cog(Admin(bot))
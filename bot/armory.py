@@ -1,99 +1,92 @@
 # Project imports
 import data.bounties as bounties
 import data.crafted_modifiers as crafted_modifiers
-from data.snapshots import get_player_snapshots
-from data.black_market import get_player_black_market_data
-from data.bounties import get_player_bounty_data
+from data.bounties import AVAILABILITIES as BOUNTY_AVAILABILITIES
+from data.snapshots import SNAPSHOT_INDEX
+from data.black_market import get_player_black_market_data, find_black_market_offers, get_black_market_item_names
+from data.bounty_diff import BountyDiffEngine
+from data.bounty_search import find_bounties, get_bounty_search_names
 from data.proficiency import get_player_proficiency_data
-from embeds import get_bounty_embed, get_player_prof_embed, get_vault_stats_embed
-from image import EmbedWithImage
+from data.progression import compare_players
+from embeds import get_bounty_embed, get_player_prof_embed, get_vault_stats_embed, get_black_market_offers_embed, get_bounty_search_embed, get_compare_embed
+from image import EmbedWithImage, HEAD_SERVICE
+from main import PREFETCH_HEADS
+from util.config_store import CONFIG_STORE
+from util.errors import report_command_error
+from util.events import BUS, WORLD_DATA_CHANGED
+from util.singleflight import SINGLE_FLIGHT
+from util.timing import TIMINGS, DISCORD_SEND
+from util.worker import run_blocking
 
 # Other imports
 import discord
 from discord import ApplicationContext
 
 from discord.commands import slash_command, Option
-from discord.ext import commands, tasks
+from discord.ext import commands
 
-import json
-import os
-from sys import platform
-
-TESTING = os.getenv("TESTING")
+import asyncio
+from typing import Union
 
 def has_alias_set():
     """
     Command decorator to check whether user has set their MC username alias.
     """
     def predicate(ctx):
-        return str(ctx.user.id) in get_config_dict()
+        return str(ctx.user.id) in CONFIG_STORE
 
     return commands.check(predicate)
 
 
-def get_player_stats(ign: str, return_keys: list) -> dict:
+async def black_market_item_autocomplete(ctx: discord.AutocompleteContext) -> list:
     """
-    Return dictionary of requested player stats, given a player name.
+    Suggest items currently offered in any black market.
     """
 
-    snapshots: list = get_player_snapshots()
+    return await run_blocking(get_black_market_item_names, ctx.value or "")
 
-    for snapshot in snapshots:
-        if snapshot["playerNickname"] == ign:
-            stats: dict = {key: snapshot[key] for key in snapshot if key in return_keys}
-            return stats
 
-    return {}
+async def bounty_reward_autocomplete(ctx: discord.AutocompleteContext) -> list:
+    """
+    Suggest items currently rewarded by any bounty.
+    """
 
-def get_config_dict() -> dict:
+    return await run_blocking(get_bounty_search_names, "reward", ctx.value or "")
+
+
+async def bounty_task_autocomplete(ctx: discord.AutocompleteContext) -> list:
     """
-    Retrieve config dict, containing info like discord -> mc username aliases,
-    preferences on being alerted for new bounties, etc.
+    Suggest task ids and types of any current bounty.
     """
 
-    if platform != "win32":
-        if TESTING == False or TESTING == "FALSE":
-            path: str = os.path.join("eternal-smp-bot", "bot", "config.json")
-        else:
-            path: str = os.path.join("test-eternal-smp-bot", "bot", "config.json")
+    return await run_blocking(get_bounty_search_names, "task", ctx.value or "")
 
-    else:
-        path: str = os.path.join("bot", "config.json")
 
-    if not os.path.isfile(path):
-        # generate file if it doesn't already exist
-        with open(path, "w") as f:
-            pass
+def get_player_stats(ign: str, return_keys: list) -> dict:
+    """
+    Return dictionary of requested player stats, given a player name.
+    Concurrent lookups of the same stats share one snapshot refresh.
+    """
 
-    with open(path, "a+") as f:
-        f.seek(0)
+    return SINGLE_FLIGHT.do(("stats", ign, tuple(return_keys)), _get_player_stats, ign, return_keys)
 
-        try:
-            data: dict = json.load(f)
 
-        except json.JSONDecodeError:
-            return {}
+def _get_player_stats(ign: str, return_keys: list) -> dict:
+    snapshot: Union[dict, None] = SNAPSHOT_INDEX.get_snapshot(ign)
 
-    return data
+    if snapshot:
+        stats: dict = {key: snapshot[key] for key in snapshot if key in return_keys}
+        return stats
 
+    return {}
 
-def write_to_config_file(data: dict) -> None:
+def get_config_dict() -> dict:
     """
-    Standardized method to write a dict to
-    the config file.
+    Retrieve config dict, containing info like discord -> mc username aliases,
+    preferences on being alerted for new bounties, etc.
     """
 
-    if platform != "win32":
-        if TESTING == False:
-            path: str = os.path.join("eternal-smp-bot", "bot", "config.json")
-        else:
-            path: str = os.path.join("test-eternal-smp-bot", "bot", "config.json")
-
-    else:
-        path: str = os.path.join("bot", "config.json")
-
-    with open(path, "w") as f:
-        json.dump(data, f, indent=4)
+    return CONFIG_STORE.get_all()
 
 
 def choose_correct_ign(ctx: ApplicationContext, user=None, mc_username=None) -> tuple:
@@ -109,21 +102,16 @@ def choose_correct_ign(ctx: ApplicationContext, user=None, mc_username=None) ->
     if mc_username:
         return (True, mc_username)
     
-    config: dict = get_config_dict()
-
-    #filter out other config info
-    aliases = {key: value["alias"] for key, value in config.items()}
-
     if user:
-        if str(user.id) in aliases:
-            return (True, aliases[str(user.id)])
+        if user_config := CONFIG_STORE.get(str(user.id)):
+            return (True, user_config["alias"])
 
         else:
             return (False, "Could not find user's alias! Have they set their alias with `/alias`?")
         
     else:
-        if str(ctx.user.id) in aliases:
-            return (True, aliases[str(ctx.user.id)])
+        if user_config := CONFIG_STORE.get(str(ctx.user.id)):
+            return (True, user_config["alias"])
 
         else:
             return (False, "Could not find your alias! Have you set your alias with `/alias`?")
@@ -132,107 +120,113 @@ def choose_correct_ign(ctx: ApplicationContext, user=None, mc_username=None) ->
 class Armory(commands.Cog):
     def __init__(self, bot: discord.Bot) -> None:
         self.bot: discord.Bot = bot
-        self.player_bounties: dict = {}
+        self.bounty_diff: BountyDiffEngine = BountyDiffEngine()
+        self.bounty_alerts_lock: asyncio.Lock = asyncio.Lock()
 
         self.bounty_alert_guild: discord.Guild = None #type: ignore
         self.bounty_alert_channel: discord.TextChannel = None #type: ignore
 
+        BUS.subscribe(WORLD_DATA_CHANGED, self.on_world_data_changed)
+
 
 
     @commands.Cog.listener()
     async def on_ready(self):
         """
-        Begin bounty reminder task loop 
+        Record everyone's current bounties, so bounty
+        alerts can start once the bounty file changes.
         """
 
+        # build gear modifier catalogue ahead of the first /crafted-modifiers
+        crafted_modifiers.get_gear_modifier_catalogue()
+
+        HEAD_SERVICE.start(asyncio.get_running_loop())
+
+        if PREFETCH_HEADS:
+            await run_blocking(SNAPSHOT_INDEX.refresh)
+            asyncio.create_task(HEAD_SERVICE.prefetch([uuid for uuid, _ in SNAPSHOT_INDEX.items()]))
+
         # Eternal SMP guild ID
         self.bounty_alert_guild = self.bot.get_guild(1064745467663102043) #type: ignore
 
         if self.bounty_alert_guild:
             self.bounty_alert_channel = self.bounty_alert_guild.get_channel(1070115776637444197) #type: ignore
 
-            self.bounty_alerts_task.start()
+            await self.check_bounty_alerts()
 
     def cog_unload(self):
-        self.bounty_alerts_task.cancel()
+        BUS.unsubscribe(WORLD_DATA_CHANGED, self.on_world_data_changed)
+        asyncio.create_task(HEAD_SERVICE.close())
 
-    
-    @tasks.loop(seconds=20)
-    async def bounty_alerts_task(self):
+    async def cog_command_error(self, ctx: ApplicationContext, error):
+        """
+        Let the user know when a command fails, or its data took too long to retrieve.
+        """
+
+        await report_command_error(ctx, error)
+
+    async def on_world_data_changed(self, paths: set):
+        """
+        Check for new bounties whenever the bounty file changes.
+        """
+
+        if bounties.FILE_DATA in paths and self.bounty_alert_channel:
+            await self.check_bounty_alerts()
+
+    @TIMINGS.timed("loop.bounty_alerts")
+    async def check_bounty_alerts(self):
         """
         Check if any players have received new bounties, 
         """
 
+        # checks are run one at a time, so a bounty is never alerted twice
+        async with self.bounty_alerts_lock:
+            await self._check_bounty_alerts()
+
+    async def _check_bounty_alerts(self):
         config: dict = get_config_dict()
 
-        # first run of task loop, initialize player bounties & wait for next loop
-        if not self.player_bounties:
-            for player_discord_id in config:
-                mc_user: str = config[player_discord_id]["alias"]
-                self.player_bounties[player_discord_id] = bounties.get_player_bounty_data(mc_user)
+        usernames: list = [user_config["alias"] for user_config in config.values()]
+        players_bounty_data: dict = await run_blocking(bounties.get_players_bounty_data, usernames)
 
-            # print(f"now {self.player_bounties=}")
-            return
+        for player_discord_id, user_config in config.items():
+            mc_user: str = user_config["alias"]
+
+            # if no bounty data on player, skip them
+            if mc_user not in players_bounty_data:
+                continue
+
+            player_uuid, current_bounty_data = players_bounty_data[mc_user]
+
+            # bounties seen for the first time (like when a user just opted in) are only recorded
+            events: list = self.bounty_diff.diff((player_discord_id, player_uuid), current_bounty_data)
+
+            # if user has alerts off
+            if not user_config.get("bounty_alerts"):
+                continue
 
-        for player_discord_id in config:
-            mc_user: str = config[player_discord_id]["alias"]
+            # if user has already accepted or completed bounty, no need to alert them for it
+            new_bounties: list = [event.bounty for event in events if event.kind == "added" and event.bounty["availability"] == "available"]
 
-            # if user bounties not initialized, as they just opted in to alerts, initialize & move on to next user
-            if player_discord_id not in self.player_bounties:
-                self.player_bounties[player_discord_id] = bounties.get_player_bounty_data(mc_user)
+            if not new_bounties:
                 continue
 
-            # if user has alerts on
-            if config[player_discord_id]["bounty_alerts"]:
-                current_bounty_data: list = bounties.get_player_bounty_data(mc_user) #type: ignore
-                # if no bounty data on player, skip them
-                if not current_bounty_data:
-                    break
-
-                #if anything in their bounty list has changed since last snapshot
-                if (stored_bounty_data := self.player_bounties[player_discord_id]) != current_bounty_data:
-
-                    stored_bounty_rewards_lists: list = [bounty["reward"]["items"] for bounty in stored_bounty_data]
-                    current_bounty_rewards_lists: list = [bounty["reward"]["items"] for bounty in current_bounty_data]
-                    
-                    # find what bounties are new
-                    new_bounties = []
-                    for i, bounty in enumerate(current_bounty_rewards_lists):
-                        # if bounty, matched on rewards list, is one of the bounties previously stored
-                        if any(bounty == stored_bounty for stored_bounty in stored_bounty_rewards_lists):
-                            continue
-
-                        # if user has already accepted or completed bounty, no need to alert them for it
-                        elif current_bounty_data[i]["availability"] != "available":
-                            continue
-                        
-                        # bounty doesn't match previously stored ones so it's new
-                        else:
-                            new_bounties.append(current_bounty_data[i])
-
-                    # update player bounty data so new bounty is no longer seen as new
-                    self.player_bounties[player_discord_id] = get_player_bounty_data(mc_user)
-
-                    # if some bounty was different but none had different rewards, aka there
-                    # are no bounties in the new_bounties list, then no need to alert
-                    if not new_bounties:
-                        return
-
-                    # inform user of their new bounty/bounties
-                    title: str = f"{mc_user}'s New Bounty" if len(new_bounties) == 1 else f"{mc_user}'s New Bounties"
-                    embed_obj: EmbedWithImage = get_bounty_embed(title, new_bounties, mc_user) #problematic
-
-                    if config[player_discord_id]["bounty_alert_pings"]:
-                        player_discord: discord.User = await self.bot.fetch_user(int(player_discord_id)) #type: ignore
-                        if embed_obj.image_file:
-                            await self.bounty_alert_channel.send(player_discord.mention, file=embed_obj.image_file, embed=embed_obj.embed)
-                        else:
-                            await self.bounty_alert_channel.send(player_discord.mention, embed=embed_obj.embed)
+            # inform user of their new bounty/bounties
+            title: str = f"{mc_user}'s New Bounty" if len(new_bounties) == 1 else f"{mc_user}'s New Bounties"
+            embed_obj: EmbedWithImage = await run_blocking(get_bounty_embed, title, new_bounties, mc_user)
+
+            with TIMINGS.span(DISCORD_SEND):
+                if user_config.get("bounty_alert_pings"):
+                    player_discord: discord.User = await self.bot.fetch_user(int(player_discord_id)) #type: ignore
+                    if embed_obj.image_file:
+                        await self.bounty_alert_channel.send(player_discord.mention, file=embed_obj.image_file, embed=embed_obj.embed)
+                    else:
+                        await self.bounty_alert_channel.send(player_discord.mention, embed=embed_obj.embed)
+                else:
+                    if embed_obj.image_file:
+                        await self.bounty_alert_channel.send(file=embed_obj.image_file, embed=embed_obj.embed)
                     else:
-                        if embed_obj.image_file:
-                            await self.bounty_alert_channel.send(file=embed_obj.image_file, embed=embed_obj.embed)
-                        else:
-                            await self.bounty_alert_channel.send(embed=embed_obj.embed)
+                        await self.bounty_alert_channel.send(embed=embed_obj.embed)
 
 
 
@@ -244,12 +238,7 @@ class Armory(commands.Cog):
         Opt in to receive alerts when you have new bounties.
         """
 
-        config: dict = get_config_dict()
-
-        config[str(ctx.user.id)]["bounty_alerts"] = enabled
-        config[str(ctx.user.id)]["bounty_alert_pings"] = ping
-
-        write_to_config_file(config)
+        CONFIG_STORE.update(str(ctx.user.id), bounty_alerts=enabled, bounty_alert_pings=ping)
 
         await ctx.respond(f"Successfully opted {'in to' if enabled else 'out of'} bounty alerts.")
 
@@ -274,9 +263,10 @@ class Armory(commands.Cog):
             return
 
         ign: str = result_str
+        await ctx.defer()
 
         to_retrieve: list = ["vaultLevel", "powerLevel", "abilities", "talents", "researches"]
-        stats: dict = get_player_stats(ign, to_retrieve)
+        stats: dict = await run_blocking(get_player_stats, ign, to_retrieve)
 
         if not stats:
             await ctx.respond("Could not find a player with given Minecraft username!",)
@@ -314,9 +304,58 @@ class Armory(commands.Cog):
         embed.add_field(name='Talents', value=talents_str, inline=True)
         embed.add_field(name='Researches', value=researches_str, inline=False)
 
-        await ctx.respond(embed=embed)
+        with TIMINGS.span(DISCORD_SEND):
+            await ctx.respond(embed=embed)
             
 
+    @slash_command(name="compare")
+    async def compare(self,
+                      ctx: ApplicationContext,
+                      mc_usernames: Option(str, "Minecraft usernames to compare, separated by spaces or commas. Your alias is added if you give one")): #type: ignore
+        """
+        Respond with an embed comparing players' talents, abilities and researches.
+        """
+
+        usernames: list = mc_usernames.replace(",", " ").split()
+
+        if len(set(username.lower() for username in usernames)) == 1:
+            result_bool, result_str = choose_correct_ign(ctx)
+
+            if not result_bool:
+                await ctx.respond(result_str)
+                return
+
+            usernames.insert(0, result_str)
+
+        # usernames are looked up case-insensitively, so drop repeats differing only in case
+        unique_usernames: list = []
+        seen: set = set()
+
+        for username in usernames:
+            if username.lower() not in seen:
+                seen.add(username.lower())
+                unique_usernames.append(username)
+
+        usernames = unique_usernames
+
+        if len(usernames) < 2:
+            await ctx.respond("Supply at least two different Minecraft usernames to compare!")
+            return
+
+        await ctx.defer()
+
+        missing, comparison = await run_blocking(compare_players, usernames)
+
+        if missing:
+            await ctx.respond(f"Could not find a player with Minecraft username `{missing[0]}`!")
+            return
+
+        embed: discord.Embed = get_compare_embed(usernames, comparison)
+
+        with TIMINGS.span(DISCORD_SEND):
+            await ctx.respond(embed=embed)
+
+
     @slash_command(name="vault-stats")
     async def vault_stats(self, 
                           ctx: ApplicationContext, 
@@ -334,9 +373,10 @@ class Armory(commands.Cog):
             return
 
         ign: str = result_str
+        await ctx.defer()
 
         to_retrieve: list = ["completed", "survived", "failed", "vaultLevel"]
-        stats: dict = get_player_stats(ign, to_retrieve)
+        stats: dict = await run_blocking(get_player_stats, ign, to_retrieve)
 
         if not stats:
             await ctx.respond("Could not find a player with given Minecraft username!",)
@@ -356,13 +396,14 @@ class Armory(commands.Cog):
             "failed": failed_vaults
         }
 
-        embed_obj: EmbedWithImage = get_vault_stats_embed(f"{ign} - Level {vault_level}", ign, vault_stats)
+        embed_obj: EmbedWithImage = await run_blocking(get_vault_stats_embed, f"{ign} - Level {vault_level}", ign, vault_stats)
 
-        if embed_obj.image_file:
-            await ctx.respond(file=embed_obj.image_file, embed=embed_obj.embed)
+        with TIMINGS.span(DISCORD_SEND):
+            if embed_obj.image_file:
+                await ctx.respond(file=embed_obj.image_file, embed=embed_obj.embed)
 
-        else:
-            await ctx.respond(embed=embed_obj.embed)
+            else:
+                await ctx.respond(embed=embed_obj.embed)
 
 
     @slash_command(name="bm")
@@ -382,8 +423,13 @@ class Armory(commands.Cog):
             return
 
         ign: str = result_str
+        await ctx.defer()
+
+        player_bm_data: Union[dict, None] = await run_blocking(get_player_black_market_data, ign)
 
-        player_bm_data: dict = get_player_black_market_data(ign)
+        if not player_bm_data:
+            await ctx.respond("Could not find black market offerings for given Minecraft username!")
+            return
 
         embed: discord.Embed = discord.Embed(title=f"{ign}'s Black Market")
         embed.color = 0x7c1bd1
@@ -397,7 +443,25 @@ class Armory(commands.Cog):
 
             embed.add_field(name=f"x{amount} {item}", value=f"Costs {cost} soul shards", inline=False)
 
-        await ctx.respond(embed=embed)
+        with TIMINGS.span(DISCORD_SEND):
+            await ctx.respond(embed=embed)
+
+
+    @slash_command(name="bm-find")
+    async def black_market_find(self,
+                                ctx: ApplicationContext,
+                                item: Option(str, "Choose an item to look for in everyone's black market", autocomplete=black_market_item_autocomplete)): #type: ignore
+        """
+        Display every player whose black market currently offers an item.
+        """
+
+        await ctx.defer()
+
+        offers, omitted_items = await run_blocking(find_black_market_offers, item)
+        embed: discord.Embed = get_black_market_offers_embed(item, offers, omitted_items)
+
+        with TIMINGS.span(DISCORD_SEND):
+            await ctx.respond(embed=embed)
 
 
     @slash_command(name="bounty")
@@ -418,16 +482,43 @@ class Armory(commands.Cog):
             return
 
         ign: str = result_str
+        await ctx.defer()
 
-        player_bounty_data: list = bounties.get_player_bounty_data(ign) #type: ignore
+        player_bounty_data: list = await run_blocking(bounties.get_player_bounty_data, ign) #type: ignore
 
-        embed_obj: EmbedWithImage = get_bounty_embed(f"{ign}'s Bounties", player_bounty_data, ign)
+        embed_obj: EmbedWithImage = await run_blocking(get_bounty_embed, f"{ign}'s Bounties", player_bounty_data, ign)
 
-        if embed_obj.image_file:
-            await ctx.respond(file=embed_obj.image_file, embed=embed_obj.embed)
+        with TIMINGS.span(DISCORD_SEND):
+            if embed_obj.image_file:
+                await ctx.respond(file=embed_obj.image_file, embed=embed_obj.embed)
 
-        else:
-            await ctx.respond(embed=embed_obj.embed)
+            else:
+                await ctx.respond(embed=embed_obj.embed)
+
+
+    @slash_command(name="bounty-find")
+    async def bounty_find(self,
+                          ctx: ApplicationContext,
+                          reward: Option(str, "Find bounties rewarding an item", required=False, autocomplete=bounty_reward_autocomplete), #type: ignore
+                          task: Option(str, "Find bounties with a task", required=False, autocomplete=bounty_task_autocomplete), #type: ignore
+                          availability: Option(str, "Only show bounties of this availability", required=False, choices=list(BOUNTY_AVAILABILITIES))): #type: ignore
+        """
+        Display every player's bounties with a given reward and/or task.
+        """
+
+        if not reward and not task:
+            await ctx.respond("Supply a reward and/or a task to look for!")
+            return
+
+        await ctx.defer()
+
+        results: list = await run_blocking(find_bounties, reward, task, availability)
+
+        title: str = " and ".join(name for name in (reward, task) if name)
+        embed: discord.Embed = get_bounty_search_embed(f"Bounties for {title}", results)
+
+        with TIMINGS.span(DISCORD_SEND):
+            await ctx.respond(embed=embed)
 
 
     @slash_command(name="crafted-modifiers")
@@ -448,8 +539,9 @@ class Armory(commands.Cog):
             return
 
         ign: str = result_str
+        await ctx.defer()
 
-        player_crafted_modifiers: list = crafted_modifiers.get_crafted_modifiers(ign) #type: ignore
+        player_crafted_modifiers: list = await run_blocking(crafted_modifiers.get_crafted_modifiers, ign) #type: ignore
 
         embed: discord.Embed = discord.Embed(title=f'{ign}\'s Crafted Modifiers')
         embed.color = 0x7c1bd1
@@ -480,7 +572,8 @@ class Armory(commands.Cog):
             # Add field
             embed.add_field(name=f'{vault_gear}', value=f"{field_string}", inline=False)
 
-        await ctx.respond(embed=embed)
+        with TIMINGS.span(DISCORD_SEND):
+            await ctx.respond(embed=embed)
 
 
     @slash_command(name="proficiency")
@@ -501,15 +594,17 @@ class Armory(commands.Cog):
             return
 
         ign: str = result_str
+        await ctx.defer()
 
-        prof_data = get_player_proficiency_data(ign)
-        embed_obj: EmbedWithImage = get_player_prof_embed(f"{ign}'s Gear Proficiencies", ign, prof_data)
+        prof_data = await run_blocking(get_player_proficiency_data, ign)
+        embed_obj: EmbedWithImage = await run_blocking(get_player_prof_embed, f"{ign}'s Gear Proficiencies", ign, prof_data)
 
-        if embed_obj.image_file:
-            await ctx.respond(file=embed_obj.image_file, embed=embed_obj.embed)
+        with TIMINGS.span(DISCORD_SEND):
+            if embed_obj.image_file:
+                await ctx.respond(file=embed_obj.image_file, embed=embed_obj.embed)
 
-        else:
-            await ctx.respond(embed=embed_obj.embed)
+            else:
+                await ctx.respond(embed=embed_obj.embed)
 
 
 def setup(bot: discord.Bot) -> None:
@@ -2,9 +2,15 @@
 import util.format as format
 import util.nbt as nbt
 import util.player as player
+import util.uuids as uuids
+from data.snapshots import SNAPSHOT_INDEX
+from util.singleflight import SINGLE_FLIGHT
+from util.views import VIEW_CACHE
 
 # Other imports
+from bisect import bisect_left
 from sys import platform
+from typing import Union
 import os
 
 
@@ -17,69 +23,298 @@ if platform != "win32":
 else:
     FILE_DATA = os.path.join("local", "dats", "the_vault_PlayerBlackMarket.dat")
 
+# (parsed black market tree, integer player UUID -> positions in its playerList) of the last indexed tree
+_player_positions: tuple = (None, {})
 
+# (versions, item index) of the last indexed black market file
+_item_index: tuple = (None, None)
 
 
-def get_black_market_player_order() -> list:
+
+def get_black_market_player_order(file=None) -> list:
     """
-    Return a list of player names, in order, to match with proper black market data.
+    Return a list of player names, in order, to match with proper black market data
+    of the given parsed black market file (the current file by default).
+    Players missing from snapshots are listed as None.
     """
 
-    file = nbt.read_nbt(FILE_DATA)
+    if file is None:
+        file = nbt.read_nbt(FILE_DATA)
 
     uuid_dict: dict = player.get_uuid_username_dict()
     player_order: list = []
 
     for player_uuid in file["data"]["playerList"].value:
-        player_order.append(uuid_dict[player_uuid.value])
+        player_order.append(uuid_dict.get(player_uuid.value))
 
     return player_order
 
 
+def get_black_market_positions(file=None) -> dict:
+    """
+    Return a dictionary of player UUIDs, as integers, and their positions in the player list
+    of the given parsed black market file (the current file by default), only rebuilt when
+    the parsed file changes. The positions are only valid for that same parsed file.
+    """
+
+    global _player_positions
+
+    if file is None:
+        file = nbt.read_nbt(FILE_DATA)
+
+    if _player_positions[0] is file:
+        return _player_positions[1]
+
+    positions: dict = {}
+
+    for position, player_uuid in enumerate(file["data"]["playerList"].value):
+        positions.setdefault(uuids.parse(player_uuid.value), []).append(position)
+
+    _player_positions = (file, positions)
+
+    return positions
+
+
+def decode_black_market_entry(bm_entry, bm_data: Union[dict, None] = None) -> dict:
+    """
+    Return the reset time and formatted trades of a single black market entry,
+    adding them to bm_data if given
+    """
+
+    if bm_data is None:
+        bm_data = {
+            "trades": [],
+            "reset": None
+        }
+
+    bm_data["reset"] = bm_entry["nextReset"].value
+
+    for trade in bm_entry["trades"]:
+
+        item: str = format.format_id(format.preformat_id(trade["trade"]["stack"]["id"].value)) #type: ignore
+        amount: int = trade["trade"]["stack"]["Count"].value
+        cost: int = trade["trade"]["cost"].value
+
+        trade: dict = {
+            item: {
+            "amount": amount, 
+            "cost": cost
+            }
+        }
+
+
+        bm_data["trades"].append(trade)
+
+    return bm_data
+
+
 def get_all_black_market_data() -> dict:
     """
     Return Black Market data on every player
     """
 
     file = nbt.read_nbt(FILE_DATA)
-    player_order: list = get_black_market_player_order()
+    player_order: list = get_black_market_player_order(file)
 
     bm_data: dict = {}
 
     for bm_entry, player in zip(file["data"]["blackMarketList"].value, player_order):
 
-        if player not in bm_data:
-            bm_data[player] = {
-                "trades": [],
-                "reset": None
-            }
+        # player missing from snapshots
+        if player is None:
+            continue
 
-        bm_data[player]["reset"] = bm_entry["nextReset"].value
+        bm_data[player] = decode_black_market_entry(bm_entry, bm_data.get(player))
 
-        for trade in bm_entry["trades"]:
+    return bm_data
 
-            item: str = format.format_id(format.preformat_id(trade["trade"]["stack"]["id"].value)) #type: ignore
-            amount: int = trade["trade"]["stack"]["Count"].value
-            cost: int = trade["trade"]["cost"].value
 
-            trade: dict = {
-                item: {
-                "amount": amount, 
-                "cost": cost
-                }
-            }
+def get_player_black_market_data(ign: str) -> Union[dict, None]:
+    """
+    Return Black Market data on individual player, or None
+    if they have no black market
+    """
+
+    player_uuid: Union[str, None] = player.get_uuid_from_username(ign)
+
+    if not player_uuid:
+        return None
+
+    uuid_value: int = uuids.parse(player_uuid)
+    versions: tuple = (nbt.get_file_version(FILE_DATA),)
+
+    return VIEW_CACHE.get("black_market", uuid_value, versions, lambda: build_player_black_market_data(uuid_value))
 
 
-            bm_data[player]["trades"].append(trade)
+def build_player_black_market_data(player_uuid: int) -> Union[dict, None]:
+    """
+    Decode the Black Market data of a player given their integer UUID
+    """
+
+    # positions and trades have to come from the same parsed file,
+    # in case the file is rewritten in between
+    file = nbt.read_nbt(FILE_DATA)
+    positions: Union[list, None] = get_black_market_positions(file).get(player_uuid)
+
+    if not positions:
+        return None
+
+    bm_list = file["data"]["blackMarketList"].value
+
+    bm_data: Union[dict, None] = None
+
+    for position in positions:
+        bm_data = decode_black_market_entry(bm_list[position], bm_data)
 
     return bm_data
 
 
-def get_player_black_market_data(ign: str) -> dict:
+class BlackMarketItemIndex():
+    """
+    Every black market offering keyed by formatted item name, with
+    sorted lowercase names for prefix searches. Every word of a name
+    is indexed, so "ingot" finds "Netherite Ingot".
+    """
+
+    def __init__(self):
+        # item name -> list of (integer player UUID, amount, cost, reset time), cheapest first
+        self.offers: dict = {}
+
+        # sorted (lowercase name from one of its words onward, item name)
+        self._search_keys: list = []
+
+
+    def add(self, item: str, offer: tuple) -> None:
+        self.offers.setdefault(item, []).append(offer)
+
+
+    def finish(self) -> None:
+        """
+        Sort the offers and search keys once every offer is added.
+        """
+
+        search_keys: set = set()
+
+        for item, offers in self.offers.items():
+            offers.sort(key=lambda offer: offer[2])
+
+            words: list = item.lower().split()
+            for position in range(len(words)):
+                search_keys.add((" ".join(words[position:]), item))
+
+        self._search_keys = sorted(search_keys)
+
+
+    def get_matching_items(self, query: str, limit: Union[int, None] = 25) -> list:
+        """
+        Return item names with a word starting with query: an exact
+        match first, then names starting with query, then the rest,
+        each alphabetically. At most limit names are returned, if
+        one is given.
+        """
+
+        query = query.strip().lower()
+        items: dict = {}
+
+        for position in range(bisect_left(self._search_keys, (query,)), len(self._search_keys)):
+            key, item = self._search_keys[position]
+
+            if not key.startswith(query):
+                break
+
+            lower_item: str = item.lower()
+
+            # ordered by (exact match, starts the name, name)
+            rank: tuple = (lower_item != query, key != lower_item, item)
+            items[item] = min(rank, items.get(item, rank))
+
+        matches: list = sorted(items, key=items.__getitem__)
+
+        return matches if limit is None else matches[:limit]
+
+
+def _build_item_index() -> BlackMarketItemIndex:
+    file = nbt.read_nbt(FILE_DATA)
+    player_list = file["data"]["playerList"].value
+
+    index: BlackMarketItemIndex = BlackMarketItemIndex()
+
+    for bm_entry, player_uuid in zip(file["data"]["blackMarketList"].value, player_list):
+        bm_data: dict = decode_black_market_entry(bm_entry)
+        uuid_value: int = uuids.parse(player_uuid.value)
+
+        for trade in bm_data["trades"]:
+            for item, offer in trade.items():
+                index.add(item, (uuid_value, offer["amount"], offer["cost"], bm_data["reset"]))
+
+    index.finish()
+
+    return index
+
+
+def get_black_market_item_index() -> BlackMarketItemIndex:
+    """
+    Return the item index of the black market file, only
+    rebuilt when the file or the lang files change.
+    """
+
+    global _item_index
+
+    versions: tuple = (nbt.get_file_version(FILE_DATA), format.lang_generation)
+
+    if _item_index[0] == versions:
+        return _item_index[1]
+
+    index: BlackMarketItemIndex = SINGLE_FLIGHT.do(("black_market_items", versions), _build_item_index)
+    _item_index = (versions, index)
+
+    return index
+
+
+def get_black_market_item_names(prefix: str, limit: int = 25) -> list:
     """
-    Return Black Market data on individual player
+    Return names of items currently offered in any black market
+    that have a word starting with prefix.
     """
 
-    bm_data: dict = get_all_black_market_data()
+    return get_black_market_item_index().get_matching_items(prefix, limit)
+
+
+def find_black_market_offers(query: str, limit: int = 25) -> tuple:
+    """
+    Return every player's offer of the item named query, or of up to
+    limit items with a word starting with query if none is named
+    exactly, as dictionaries of item, player, amount, cost and reset
+    time, along with the number of matching items left out. Players
+    missing from snapshots are left out.
+    """
+
+    index: BlackMarketItemIndex = get_black_market_item_index()
+    items: list = index.get_matching_items(query, None)
+
+    if items and items[0].lower() == query.strip().lower():
+        items = items[:1]
+
+    omitted: int = max(len(items) - limit, 0)
+    items = items[:limit]
+
+    SNAPSHOT_INDEX.refresh()
+
+    offers: list = []
+
+    for item in items:
+        for player_uuid, amount, cost, reset in index.offers[item]:
+            snapshot: Union[dict, None] = SNAPSHOT_INDEX.get(uuids.to_dashed(player_uuid))
+
+            if snapshot:
+                offers.append({
+                    "item": item,
+                    "player": snapshot["playerNickname"],
+                    "amount": amount,
+                    "cost": cost,
+                    "reset": reset
+                })
+
+    offers.sort(key=lambda offer: offer["cost"])
 
-    return bm_data[ign]
\ No newline at end of file
+    return (offers, omitted)
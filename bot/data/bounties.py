@@ -2,12 +2,15 @@
 import util.format as format
 import util.nbt as nbt
 import util.player as player
+import util.uuids as uuids
+from util.singleflight import SINGLE_FLIGHT
+from util.timing import TIMINGS, BOUNTY_DECODE
+from data.snapshots import SNAPSHOT_INDEX
 from main import TESTING
 
 # Other imports
 import os
 from sys import platform
-import json
 
 
 
@@ -27,6 +30,18 @@ else:
     FILE_LANG = os.path.join("lang", "bounties.json")
 
 
+# Bounty availabilities, in the order they are listed for each player
+AVAILABILITIES: tuple = ("legendary", "active", "available", "complete")
+
+# ((file version, lang generation), integer player UUID -> bounty list) of the last decoded bounty file
+_decoded_bounties: tuple = (None, {})
+
+# integer player UUID -> (lang generation, encoded bounty lists per availability)
+# of each player in the last decoded bounty file, to reuse their decoded list
+# when it's unchanged
+_player_raw_bounties: dict = {}
+
+
 
 def get_bounty_player_order() -> list:
     """
@@ -45,164 +60,232 @@ def get_bounty_player_order() -> list:
     return player_order
 
 
-def get_all_bounty_data() -> dict:
+def decode_all_bounties() -> dict:
     """
-    Return the bounty data for all players
+    Return a dictionary of player UUIDs, as integers, and their bounty lists.
+
+    The bounty file is walked once for every player, and the result is
+    reused until the file or the lang files change, so the returned
+    lists are shared between callers and must not be modified. When the
+    file changes, only players whose bounties changed are decoded again;
+    everyone else keeps the same list object as before.
     """
 
-    bounty_player_order: list = get_bounty_player_order()
+    version: tuple = (nbt.get_file_version(FILE_DATA), format.lang_generation)
+
+    if _decoded_bounties[0] == version:
+        return _decoded_bounties[1]
+
+    # lookups arriving while the new file is being decoded wait for that decode
+    return SINGLE_FLIGHT.do(("bounties", version), _decode_bounty_file, version)
+
+
+def _decode_bounty_file(version: tuple) -> dict:
+    global _decoded_bounties, _player_raw_bounties
+
+    # Retrieve bounty file
+    bounties_file = nbt.read_nbt(FILE_DATA)
+
+    # Retrieve bounties.json task schema
+    bounty_tasks: dict = format.load_json(FILE_LANG)["tasks"]
+
+    previous_bounties: dict = _decoded_bounties[1]
+
+    # Collect every player's encoded bounty lists, in availability order
+    raw_bounties: dict = {}
+
+    for bounty_availability in AVAILABILITIES:
+        availability_tag = bounties_file['data'][bounty_availability]
+
+        for player_uuid in availability_tag: #type: ignore
+            raw_bounties.setdefault(uuids.parse(player_uuid), []).append(
+                (bounty_availability, player_uuid, availability_tag.get_raw(player_uuid)) #type: ignore
+            )
 
+    # Initiate bounty lists
     bounty_data: dict = {}
+    player_raw_bounties: dict = {}
+
+    with TIMINGS.span(BOUNTY_DECODE):
+
+        # Loop through every player's bounties
+        for uuid_value, player_raw in raw_bounties.items():
+            raw_key: tuple = (format.lang_generation, tuple(player_raw))
+            player_raw_bounties[uuid_value] = raw_key
+
+            # Reuse the player's bounty list if it hasn't changed
+            if _player_raw_bounties.get(uuid_value) == raw_key and uuid_value in previous_bounties:
+                bounty_data[uuid_value] = previous_bounties[uuid_value]
+                continue
+
+            bounty_list: list = bounty_data.setdefault(uuid_value, [])
 
-    for player in bounty_player_order:
-        bounty_data[player] = get_player_bounty_data(player)
+            for bounty_availability, player_uuid, _ in player_raw:
+                for bounty in bounties_file['data'][bounty_availability][player_uuid].value: #type: ignore
+                    bounty_list.append(decode_bounty(bounty, bounty_availability, bounty_tasks))
+
+    _decoded_bounties = (version, bounty_data)
+    _player_raw_bounties = player_raw_bounties
 
     return bounty_data
 
 
-def get_player_bounty_data(username: str):
+def decode_bounty(bounty, bounty_availability: str, bounty_tasks: dict) -> dict:
     """
-    Return the bounty data for an individual player
+    Return the formatted data of a single bounty tag
     """
 
-    # Retrieve bounty file
-    bounties_file = nbt.read_nbt(FILE_DATA)
+    # Get bounty details
+    bounty_details = bounty['task']
 
-    # Retrieve player UUID
-    playerUUID = player.get_uuid_from_username(username)
 
-    # Guard clause
-    if not playerUUID:
-        return None
+    # Retrieve bounty task details
+    bounty_task_details: str = bounty_details['properties']
 
-    # Initiate bounty list
-    bounty_list: list = []
+    # Retrieve bounty task variables
+    bounty_task_type: str = bounty_task_details['taskType'].value #type: ignore
+    bounty_task_amount_obtained: int = bounty_details["amountObtained"].value
+    bounty_task_amount: int = round(bounty_task_details['amount'].value) #type: ignore
 
-    # Loop through bounty availabilities
-    for bounty_availability in ["legendary", "active", "available", "complete"]:
+    # Retrieve bounty variable
+    bounty_task_id: str = bounty_task_details[bounty_tasks[bounty_task_type]["taskId"]].value #type: ignore
 
-        # Check if bounty availability exists
-        #if bounties_file['data'][bounty_availability] is None:
-            #continue
+    # Keep raw ids, which don't change with the lang files
+    raw_task_type: str = bounty_task_type
+    raw_task_id: str = bounty_task_id
 
-        # Loop through bounties
-        for bounty in bounties_file['data'][bounty_availability][playerUUID].value: #type: ignore
+    # Pre-format ids
+    bounty_task_id = format.preformat_id(bounty_task_id)
 
-            # Get bounty details
-            bounty_details = bounty['task']
+    # Format ids
+    bounty_task_id = format.format_id(
+        bounty_task_id,
+        [
+            {
+                "file_path": FILE_LANG,
+                "id_path": f"tasks.{bounty_task_type}.ids"
+            }
+        ]
+    )
+    bounty_task_type = format.format_id(
+        bounty_task_type,
+        [
+            {
+                "file_path": FILE_LANG,
+                "id_path": "tasks",
+                "name_path": f"tasks.{bounty_task_type}.name"
+            }
+        ]
+    )
 
 
-            # Retrieve bounty task details
-            bounty_task_details: str = bounty_details['properties']
+    # Retrieve bounty reward details
+    bounty_reward_details: str = bounty_details['reward']
 
-            # Retrieve bounty task variables
-            bounty_task_type: str = bounty_task_details['taskType'].value #type: ignore
-            bounty_task_amount_obtained: int = bounty_details["amountObtained"].value
-            bounty_task_amount: int = round(bounty_task_details['amount'].value) #type: ignore
-            bounty_task_id: str
+    # Initiate bounty rewards, keyed by reward id
+    bounty_rewards: dict = {}
 
-            with open(FILE_LANG, "r") as f:
-                
-                # Retrieve bounties.json data
-                bounties_lang: dict = json.load(f)
+    # Loop through reward items
+    for bounty_reward in bounty_reward_details['items'].value: #type: ignore
 
-                # Retrieve bounty variable
-                bounty_task_id = bounty_task_details[bounties_lang["tasks"][bounty_task_type]["taskId"]].value #type: ignore
-            
-            # Pre-format ids
-            bounty_task_id = format.preformat_id(bounty_task_id)
+        # Retrieve bounty reward data
+        bounty_reward = bounty_reward['stack']
 
-            # Format ids
-            bounty_task_id = format.format_id(
-                bounty_task_id,
-                [
-                    {
-                        "file_path": FILE_LANG,
-                        "id_path": f"tasks.{bounty_task_type}.ids"
-                    }
-                ]
-            )
-            bounty_task_type = format.format_id(
-                bounty_task_type,
-                [
-                    {
-                        "file_path": FILE_LANG,
-                        "id_path": "tasks",
-                        "name_path": f"tasks.{bounty_task_type}.name"
-                    }
-                ]
-            )
+        # Retrieve bounty reward variables
+        bounty_reward_id: str = bounty_reward['id'].value
+        bounty_reward_count: int = bounty_reward['Count'].value
 
+        # Combine counts if reward is registered
+        if bounty_reward_id in bounty_rewards:
+            bounty_rewards[bounty_reward_id]["count"] += bounty_reward_count
 
-            # Retrieve bounty reward details
-            bounty_reward_details: str = bounty_details['reward']
-
-            # Initiate bounty rewards
-            bounty_rewards: list[dict] = []
-
-            # Loop through reward items
-            for bounty_reward in bounty_reward_details['items'].value: #type: ignore
-
-                # Retrieve bounty reward data
-                bounty_reward = bounty_reward['stack']
-
-                # Retrieve bounty reward variables
-                bounty_reward_id: str = bounty_reward['id'].value
-                bounty_reward_count: int = bounty_reward['Count'].value
-
-                # Initiate reward boolean
-                bounty_reward_exists: bool = False
-
-                # Combine counts if reward is registered
-                for index in range(len(bounty_rewards)):
-                    if bounty_rewards[index]["id"] == bounty_reward_id:
-                        bounty_reward_exists = True
-                        bounty_rewards[index]["count"] += bounty_reward_count
-
-                # Register reward
-                if not bounty_reward_exists:
-                    bounty_rewards.append({
-                        "id": bounty_reward_id,
-                        "count": bounty_reward_count
-                    })
-
-            # Format bounty rewards
-            for bounty_reward in bounty_rewards:
-
-                # Initiate variables
-                bounty_reward_id = bounty_reward['id']
-                
-                # Format id
-                bounty_reward['id'] = format.format_id(format.preformat_id(bounty_reward_id))
-
-            # Sort bounty rewards by quantity
-            bounty_rewards = sorted(bounty_rewards, key=lambda x: x["count"], reverse=True)
-
-            # Retrieve bounty variables
-            bounty_reward_experience = bounty_reward_details['vaultExp'].value #type: ignore
-            
-            # Bounty data
-            bounty_dict: dict = {
-                "availability": bounty_availability,
-                "task": {
-                    "type": bounty_task_type,
-                    "amount_obtained": bounty_task_amount_obtained,
-                    "amount": bounty_task_amount,
-                    "id": bounty_task_id
-                },
-                "reward": {
-                    "vault_experience": bounty_reward_experience,
-                    "items": bounty_rewards
-                }
+        # Register reward
+        else:
+            bounty_rewards[bounty_reward_id] = {
+                "id": format.format_id(format.preformat_id(bounty_reward_id)),
+                "raw_id": bounty_reward_id,
+                "count": bounty_reward_count
             }
 
-            # Retrieve bounty refresh time
-            if bounty_availability == "complete":
-                bounty_dict["refresh_time"] = bounty["expiration"].value
+    # Sort bounty rewards by quantity
+    bounty_reward_list: list = sorted(bounty_rewards.values(), key=lambda x: x["count"], reverse=True)
 
-            # Add bounty to bounty list
-            bounty_list.append(bounty_dict)
-    
+    # Retrieve bounty variables
+    bounty_reward_experience = bounty_reward_details['vaultExp'].value #type: ignore
     
+    # Bounty data
+    bounty_dict: dict = {
+        "availability": bounty_availability,
+        "task": {
+            "type": bounty_task_type,
+            "amount_obtained": bounty_task_amount_obtained,
+            "amount": bounty_task_amount,
+            "id": bounty_task_id,
+            "raw_type": raw_task_type,
+            "raw_id": raw_task_id
+        },
+        "reward": {
+            "vault_experience": bounty_reward_experience,
+            "items": bounty_reward_list
+        }
+    }
+
+    # Retrieve bounty refresh time
+    if bounty_availability == "complete":
+        bounty_dict["refresh_time"] = bounty["expiration"].value
+
+    return bounty_dict
+
+
+def get_all_bounty_data() -> dict:
+    """
+    Return the bounty data for all players
+    """
+
+    usernames: dict = {uuids.parse(player_uuid): username for player_uuid, username in player.get_uuid_username_dict().items()}
+
+    bounty_data: dict = {}
+
+    for player_uuid, bounty_list in decode_all_bounties().items():
+        if player_uuid in usernames:
+            bounty_data[usernames[player_uuid]] = bounty_list
+
+    return bounty_data
+
+
+def get_player_bounty_data(username: str):
+    """
+    Return the bounty data for an individual player
+    """
+
+    # Retrieve player UUID
+    playerUUID = player.get_uuid_from_username(username)
+
+    # Guard clause
+    if not playerUUID:
+        return None
+
     # Return bounty list
-    return bounty_list
\ No newline at end of file
+    return decode_all_bounties().get(uuids.parse(playerUUID), [])
+
+
+
+def get_players_bounty_data(usernames: list) -> dict:
+    """
+    Return the bounty data for several players, keyed by username,
+    alongside the UUID each username belongs to. Players that
+    can't be found are left out.
+    """
+
+    all_bounty_data: dict = decode_all_bounties()
+    SNAPSHOT_INDEX.refresh()
+
+    bounty_data: dict = {}
+
+    for username in usernames:
+        player_uuid = SNAPSHOT_INDEX.get_uuid(username, refresh=False)
+
+        if player_uuid:
+            bounty_data[username] = (player_uuid, all_bounty_data.get(uuids.parse(player_uuid), []))
+
+    return bounty_data
\ No newline at end of file
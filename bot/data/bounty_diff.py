@@ -0,0 +1,105 @@
+# Other imports
+from collections import namedtuple
+from typing import Union
+
+
+# kind is one of "added", "removed" or "state_changed"
+BountyEvent = namedtuple("BountyEvent", ["kind", "bounty", "previous_availability"])
+
+
+def get_bounty_fingerprint(bounty: dict) -> int:
+    """
+    Return a fingerprint identifying a bounty by its task and rewards,
+    which stays the same as the bounty is accepted, progressed and completed.
+
+    Only raw ids are used, so reloading the lang files with different
+    translations doesn't make every bounty look new.
+    """
+
+    task: dict = bounty["task"]
+    reward: dict = bounty["reward"]
+
+    return hash((
+        task["raw_type"],
+        task["raw_id"],
+        task["amount"],
+        reward["vault_experience"],
+        tuple(sorted((item["raw_id"], item["count"]) for item in reward["items"]))
+    ))
+
+
+class BountyDiffEngine():
+    """
+    Tracks each player's bounties between checks, reporting
+    which bounties were added, removed or changed availability.
+
+    Each player's bounties are kept as a fingerprint -> bounty map,
+    so a check is linear in the size of their bounty list, and free
+    when the list is the same (cached) object as last time.
+    """
+
+    def __init__(self):
+        # player key -> (last bounty list, {(fingerprint, occurrence): bounty})
+        self._players: dict = {}
+
+
+    def diff(self, player_key, bounty_list: list) -> list:
+        """
+        Return a list of BountyEvents for how a player's bounties changed
+        since the last call with the same key.
+
+        The first call for a player only records their bounties.
+        """
+
+        previous = self._players.get(player_key)
+
+        if previous is not None and previous[0] is bounty_list:
+            return []
+
+        current: dict = self._index(bounty_list)
+        self._players[player_key] = (bounty_list, current)
+
+        if previous is None:
+            return []
+
+        previous_bounties: dict = previous[1]
+        events: list = []
+
+        for key, bounty in current.items():
+            previous_bounty: Union[dict, None] = previous_bounties.get(key)
+
+            if previous_bounty is None:
+                events.append(BountyEvent("added", bounty, None))
+
+            elif previous_bounty["availability"] != bounty["availability"]:
+                events.append(BountyEvent("state_changed", bounty, previous_bounty["availability"]))
+
+        for key, bounty in previous_bounties.items():
+            if key not in current:
+                events.append(BountyEvent("removed", bounty, bounty["availability"]))
+
+        return events
+
+
+    def forget(self, player_key) -> None:
+        """
+        Stop tracking a player, so their next check only records their bounties.
+        """
+
+        self._players.pop(player_key, None)
+
+
+    def _index(self, bounty_list: list) -> dict:
+        index: dict = {}
+        occurrences: dict = {}
+
+        for bounty in bounty_list:
+            fingerprint: int = get_bounty_fingerprint(bounty)
+
+            # identical bounties are told apart by how many came before them
+            occurrence: int = occurrences.get(fingerprint, 0)
+            occurrences[fingerprint] = occurrence + 1
+
+            index[(fingerprint, occurrence)] = bounty
+
+        return index
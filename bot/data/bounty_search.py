@@ -0,0 +1,227 @@
+# Project imports
+import data.bounties as bounties
+import util.uuids as uuids
+from data.snapshots import SNAPSHOT_INDEX
+
+# Other imports
+import threading
+from bisect import bisect_left, insort
+from typing import Union
+
+
+# a bounty is found by its reward items, or by its task's id or type
+KINDS: tuple = ("reward", "task")
+
+
+def get_bounty_names(bounty: dict) -> dict:
+    """
+    Return the (kind, lowercase name) -> name pairs a bounty is found by.
+    """
+
+    names: dict = {}
+
+    for name in (bounty["task"]["id"], bounty["task"]["type"]):
+        names[("task", name.lower())] = name
+
+    for item in bounty["reward"]["items"]:
+        names[("reward", item["id"].lower())] = item["id"]
+
+    return names
+
+
+class BountySearchIndex():
+    """
+    Every player's bounties keyed by reward item and by task (both its id
+    and its type), split by availability, so finding who has a bounty is
+    linear in the number of matches.
+
+    A player is only re-indexed when their list from decode_all_bounties
+    is a different object from the one last indexed, which only happens
+    when their bounties changed.
+    """
+
+    def __init__(self):
+        # (kind, lowercase name, availability) -> {integer player UUID: [bounty, ...]}
+        self._postings: dict = {}
+
+        # integer player UUID -> (bounty list, posting keys it's indexed under)
+        self._players: dict = {}
+
+        # kind -> sorted lowercase names, for autocompletion
+        self._names: dict = {kind: [] for kind in KINDS}
+
+        # (kind, lowercase name) -> [name, number of posting keys using it]
+        self._name_counts: dict = {}
+
+        # the decode_all_bounties result last indexed
+        self._source: Union[dict, None] = None
+        self._lock: threading.Lock = threading.Lock()
+
+
+    def _add_player(self, uuid: int, bounty_list: list) -> None:
+        keys: set = set()
+
+        for bounty in bounty_list:
+            for (kind, lower_name), name in get_bounty_names(bounty).items():
+                key: tuple = (kind, lower_name, bounty["availability"])
+                players: Union[dict, None] = self._postings.get(key)
+
+                if players is None:
+                    players = self._postings[key] = {}
+                    self._add_name(kind, lower_name, name)
+
+                players.setdefault(uuid, []).append(bounty)
+                keys.add(key)
+
+        self._players[uuid] = (bounty_list, keys)
+
+
+    def _remove_player(self, uuid: int) -> None:
+        entry: Union[tuple, None] = self._players.pop(uuid, None)
+
+        if entry is None:
+            return
+
+        for key in entry[1]:
+            players: dict = self._postings[key]
+            del players[uuid]
+
+            if not players:
+                del self._postings[key]
+                self._remove_name(key[0], key[1])
+
+
+    def _add_name(self, kind: str, lower_name: str, name: str) -> None:
+        count: Union[list, None] = self._name_counts.get((kind, lower_name))
+
+        if count is None:
+            self._name_counts[(kind, lower_name)] = [name, 1]
+            insort(self._names[kind], lower_name)
+
+        else:
+            count[1] += 1
+
+
+    def _remove_name(self, kind: str, lower_name: str) -> None:
+        count: list = self._name_counts[(kind, lower_name)]
+        count[1] -= 1
+
+        if count[1] == 0:
+            del self._name_counts[(kind, lower_name)]
+
+            names: list = self._names[kind]
+            del names[bisect_left(names, lower_name)]
+
+
+    def refresh(self) -> None:
+        """
+        Re-index the players whose bounties changed since the last refresh.
+        """
+
+        # decode while holding the lock, so a refresh that read an older
+        # file can't apply its result after one that read a newer file
+        with self._lock:
+            bounty_data: dict = bounties.decode_all_bounties()
+
+            if bounty_data is self._source:
+                return
+
+            for uuid in self._players.keys() - bounty_data.keys():
+                self._remove_player(uuid)
+
+            for uuid, bounty_list in bounty_data.items():
+                entry: Union[tuple, None] = self._players.get(uuid)
+
+                if entry is not None and entry[0] is bounty_list:
+                    continue
+
+                self._remove_player(uuid)
+                self._add_player(uuid, bounty_list)
+
+            self._source = bounty_data
+
+
+    def find(self, reward: Union[str, None] = None, task: Union[str, None] = None, availability: Union[str, None] = None) -> list:
+        """
+        Return (integer player UUID, bounty) of every bounty with the given
+        reward item and/or task id or type, optionally of one availability.
+        Names are matched case-insensitively.
+        """
+
+        if not reward and not task:
+            return []
+
+        self.refresh()
+
+        availabilities: tuple = (availability,) if availability else bounties.AVAILABILITIES
+
+        # look bounties up by one name, and filter them by the other
+        kind, name = ("reward", reward) if reward else ("task", task)
+        other_key: Union[tuple, None] = ("task", task.strip().lower()) if reward and task else None
+
+        matches: list = []
+
+        with self._lock:
+            for bounty_availability in availabilities:
+                players: dict = self._postings.get((kind, name.strip().lower(), bounty_availability), {}) #type: ignore
+
+                for uuid, player_bounties in players.items():
+                    for bounty in player_bounties:
+                        if other_key is None or other_key in get_bounty_names(bounty):
+                            matches.append((uuid, bounty))
+
+        return matches
+
+
+    def get_names(self, kind: str, prefix: str, limit: int = 25) -> list:
+        """
+        Return up to limit reward or task names starting with prefix.
+        """
+
+        prefix = prefix.strip().lower()
+
+        with self._lock:
+            names: list = self._names[kind]
+            matches: list = []
+
+            for position in range(bisect_left(names, prefix), len(names)):
+                if not names[position].startswith(prefix) or len(matches) >= limit:
+                    break
+
+                matches.append(self._name_counts[(kind, names[position])][0])
+
+        return matches
+
+
+BOUNTY_SEARCH: BountySearchIndex = BountySearchIndex()
+
+
+def find_bounties(reward: Union[str, None] = None, task: Union[str, None] = None, availability: Union[str, None] = None) -> list:
+    """
+    Return (player name, bounty) of every bounty with the given reward
+    item and/or task, optionally of one availability. Players missing
+    from snapshots are left out.
+    """
+
+    matches: list = BOUNTY_SEARCH.find(reward, task, availability)
+    SNAPSHOT_INDEX.refresh()
+
+    results: list = []
+
+    for uuid, bounty in matches:
+        snapshot: Union[dict, None] = SNAPSHOT_INDEX.get(uuids.to_dashed(uuid))
+
+        if snapshot:
+            results.append((snapshot["playerNickname"], bounty))
+
+    return results
+
+
+def get_bounty_search_names(kind: str, prefix: str) -> list:
+    """
+    Return reward or task names starting with prefix, for autocompletion.
+    """
+
+    BOUNTY_SEARCH.refresh()
+
+    return BOUNTY_SEARCH.get_names(kind, prefix)
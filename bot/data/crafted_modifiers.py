@@ -1,9 +1,10 @@
 # Project imports
 import util.config as config
-import util.converter as converter
 import util.format as format
 import util.nbt as nbt
 import util.player as player
+import util.uuids as uuids
+from util.views import VIEW_CACHE
 from main import TESTING
 
 # Other imports
@@ -28,36 +29,124 @@ else:
     FILE_DATA = os.path.join("local", "dats", "the_vault_DiscoveredWorkbenchModifiers.dat")
     FILE_LANG = os.path.join("lang", "crafted_modifiers.json")
 
+# Directory holding the per-gear modifier configs
+GEAR_MODIFIERS_DIRECTORY = os.path.join('config', 'the_vault', 'gear_modifiers')
 
+# (directory signature, (gear, identifier, tier) -> [min, max]) of the last built catalogue
+_gear_modifier_catalogue: tuple = (None, {})
 
-def get_crafted_modifiers_data() -> dict:
+
+
+def get_gear_modifiers_signature() -> tuple:
     """
-    Returns a dictionary of player names, with the corresponding discovered crafted modifiers 
+    Returns a tuple identifying the current state of the gear modifier config directory
     """
 
-    # Retrieve nbt data
-    nbt_data = nbt.read_nbt(FILE_DATA)
+    signature: list = []
+
+    with os.scandir(GEAR_MODIFIERS_DIRECTORY) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+
+    return tuple(sorted(signature))
+
+
+def get_gear_modifier_catalogue() -> dict:
+    """
+    Returns a dictionary mapping (gear, identifier, tier) to the formatted min / max values
+    of every crafted modifier, rebuilding it only when the config directory changes
+    """
+
+    global _gear_modifier_catalogue
+
+    signature: tuple = get_gear_modifiers_signature()
+
+    if _gear_modifier_catalogue[0] != signature:
+        _gear_modifier_catalogue = (signature, build_gear_modifier_catalogue())
+
+    return _gear_modifier_catalogue[1]
 
-    # Initiate variables
-    crafted_modifiers_data: dict = {}
 
-    # Loop through entries
-    for entry in nbt_data['data']['crafts'].value:
+def build_gear_modifier_catalogue() -> dict:
+    """
+    Reads every gear modifier config file into a (gear, identifier, tier) -> [min, max] dictionary
+    """
+
+    # Initiate catalogue
+    catalogue: dict = {}
+
+    # Loop through gear modifier config files
+    for file_name in sorted(os.listdir(GEAR_MODIFIERS_DIRECTORY)):
+
+        # Guard clause
+        if not file_name.endswith('.json'):
+            continue
 
         # Initiate variables
-        player_crafted_modifiers = entry['itemCrafts'].value
-        player_uuid = entry['player'].value
+        vault_gear = file_name[:-len('.json')]
+
+        # Read crafted modifiers config file
+        with open(os.path.join(GEAR_MODIFIERS_DIRECTORY, file_name), 'r') as f:
+            gear_modifier_config: dict = json.load(f)
 
-        player_uuid_hex = ''
+        # Loop through crafted modifier positions, prefixes taking priority
+        for position in ['prefix', 'suffix']:
+
+            # Initiate variables
+            available_crafted_modifiers = gear_modifier_config['modifierGroup'].get(f'CRAFTED_{position.upper()}', [])
 
-        for i in player_uuid:
-           player_uuid_hex += f'{converter.tohex(i, 32).lstrip("0x")}'
+            # Loop through available crafted modifiers
+            for available_crafted_modifier in available_crafted_modifiers:
 
-        # Add data to dictionary
-        crafted_modifiers_data[player_uuid_hex] = player_crafted_modifiers
+                # Initiate variables
+                crafted_modifier_id = available_crafted_modifier['identifier']
+
+                # Loop through modifier tiers
+                for crafted_modifier_tier, crafted_modifier_tier_data in enumerate(available_crafted_modifier['tiers']):
+
+                    # Guard clause
+                    if (vault_gear, crafted_modifier_id, crafted_modifier_tier) in catalogue:
+                        continue
+
+                    # Soulbound has no value range
+                    if 'soulbound' in crafted_modifier_id:
+                        catalogue[(vault_gear, crafted_modifier_id, crafted_modifier_tier)] = [1, 1]
+                        continue
+
+                    # Initiate variables
+                    crafted_modifier_value_min = crafted_modifier_tier_data['value']['min']
+                    crafted_modifier_value_max = crafted_modifier_tier_data['value']['max']
+
+                    # Format values
+                    if crafted_modifier_value_min % 1 != 0 or crafted_modifier_value_max % 1 != 0:
+                        crafted_modifier_value_min = f'{round(crafted_modifier_value_min * 100)}%'
+                        crafted_modifier_value_max = f'{round(crafted_modifier_value_max * 100)}%'
+
+                    catalogue[(vault_gear, crafted_modifier_id, crafted_modifier_tier)] = [crafted_modifier_value_min, crafted_modifier_value_max]
+
+    # Return catalogue
+    return catalogue
+
+
+def get_crafted_modifiers_data() -> dict:
+    """
+    Returns a dictionary of player UUIDs, as integers, with the corresponding discovered crafted modifiers 
+    """
+
+    # Retrieve nbt data
+    nbt_data = nbt.read_nbt(FILE_DATA)
+    entries: list = nbt_data['data']['crafts'].value
+
+    # Convert every player's IntArray UUID in one go
+    player_uuids: list = uuids.from_int_arrays([entry['player'].value for entry in entries])
 
     # Return data
-    return crafted_modifiers_data
+    return {
+        player_uuid: entry['itemCrafts'].value
+        for player_uuid, entry in zip(player_uuids, entries)
+    }
 
 
 def get_crafted_modifiers(username: str):
@@ -72,11 +161,26 @@ def get_crafted_modifiers(username: str):
     if not player_uuid:
         return None
 
+    # Reuse the formatted modifiers until the workbench data or gear configs change
+    uuid_value: int = uuids.parse(player_uuid)
+    versions: tuple = (nbt.get_file_version(FILE_DATA), get_gear_modifiers_signature())
+
+    return VIEW_CACHE.get("crafted_modifiers", uuid_value, versions, lambda: build_crafted_modifiers(uuid_value))
+
+
+def build_crafted_modifiers(player_uuid: int) -> dict:
+    """
+    Formats the discovered crafted modifiers of a player given their integer UUID
+    """
+
     # Initiate crafted modifiers dictionary
     crafted_modifiers: dict = {}
 
     # Retrieve available crafted modifiers
-    crafted_modifiers_data = get_crafted_modifiers_data().get(player_uuid.replace('-', ''))
+    crafted_modifiers_data = get_crafted_modifiers_data().get(player_uuid)
+
+    # Retrieve gear modifier values
+    gear_modifier_catalogue: dict = get_gear_modifier_catalogue()
 
     # Loop through vault gear pieces
     for vault_gear in crafted_modifiers_data:
@@ -95,62 +199,9 @@ def get_crafted_modifiers(username: str):
             if 'cdr' in crafted_modifier_id:
                 crafted_modifier_id = crafted_modifier_id.replace('cdr', 'cooldown_reduction')
 
-            # Initiate variables
-            crafted_modifier_values = []
-
-            # Read crafted modifiers config file
-            with open(os.path.join('config', 'the_vault', 'gear_modifiers', f'{vault_gear.replace("the_vault:", "")}.json'), 'r') as f:
-                
-                # Retrieve config file data
-                gear_modifier_config: dict = json.load(f)
-
-                # Initiate variables
-                crafted_modifier_positions = ['prefix', 'suffix']
+            # Retrieve crafted modifier values
+            crafted_modifier_values = list(gear_modifier_catalogue.get((vault_gear.replace("the_vault:", ""), crafted_modifier_id, crafted_modifier_tier), []))
 
-                # Loop through crafted modifier positions
-                for position in crafted_modifier_positions:
-                    
-                    # Guard clause
-                    if f'CRAFTED_{position.upper()}' not in gear_modifier_config['modifierGroup'].keys():
-                        continue
-
-                    # Initiate variables
-                    available_crafted_modifiers = gear_modifier_config['modifierGroup'].get(f'CRAFTED_{position.upper()}')
-
-                    # Loop through available crafted modifiers
-                    for available_crafted_modifier in available_crafted_modifiers:
-
-                        # Guard clause
-                        if available_crafted_modifier['identifier'] != crafted_modifier_id:
-                            continue
-                        
-                        # Initiate variables
-                        crafted_modifier_tier_data = available_crafted_modifier['tiers'][crafted_modifier_tier]
-
-                        # Guard clause
-                        if 'soulbound' in crafted_modifier_id:
-                            crafted_modifier_values.append(1)
-                            crafted_modifier_values.append(1)
-                            break
-
-                        # Initiate variables
-                        crafted_modifier_value_min = crafted_modifier_tier_data['value']['min']
-                        crafted_modifier_value_max = crafted_modifier_tier_data['value']['max']
-
-                        # Format values
-                        if crafted_modifier_value_min % 1 != 0 or crafted_modifier_value_max % 1 != 0:
-                            crafted_modifier_value_min = f'{round(crafted_modifier_value_min * 100)}%'
-                            crafted_modifier_value_max = f'{round(crafted_modifier_value_max * 100)}%'
-
-                        crafted_modifier_values.append(crafted_modifier_value_min)
-                        crafted_modifier_values.append(crafted_modifier_value_max)
-
-                        # Break for loop
-                        break
-
-                    if len(crafted_modifier_values) != 0:
-                        break
-                    
             # Format variables
             crafted_modifier_id = format.format_id(
                 crafted_modifier_id,
@@ -0,0 +1,217 @@
+# Project imports
+import util.nbt as nbt
+from data.proficiency import FILE_DATA as PROFICIENCY_FILE
+from data.snapshots import SNAPSHOT_INDEX, SnapshotIndex
+
+# Other imports
+import threading
+from bisect import bisect_left, insort
+from typing import Union
+
+
+# metric -> display name
+SNAPSHOT_METRICS: dict = {
+    "vaultLevel": "Vault Level",
+    "powerLevel": "Power Level",
+    "completed": "Vaults Completed",
+    "survived": "Vaults Survived",
+    "failed": "Vaults Failed"
+}
+
+PROFICIENCIES: tuple = ("helmet", "chestplate", "leggings", "boots", "magnet", "sword", "axe", "shield", "idol")
+
+PROFICIENCY_METRICS: dict = {f"proficiency.{prof}": f"{prof.title()} Proficiency" for prof in PROFICIENCIES}
+
+METRICS: dict = {**SNAPSHOT_METRICS, **PROFICIENCY_METRICS}
+
+
+class MetricIndex():
+    """
+    Players ordered by one metric, highest first, with
+    ties broken by UUID so the order is stable.
+    """
+
+    def __init__(self):
+        # sorted (-value, uuid)
+        self._order: list = []
+        self._values: dict = {}
+
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+    def set(self, uuid: str, value) -> None:
+        if self._values.get(uuid) == value:
+            return
+
+        self.remove(uuid)
+
+        self._values[uuid] = value
+        insort(self._order, (-value, uuid))
+
+
+    def remove(self, uuid: str) -> None:
+        value = self._values.pop(uuid, None)
+
+        if value is None:
+            return
+
+        del self._order[bisect_left(self._order, (-value, uuid))]
+
+
+    def get_range(self, start: int, count: int) -> list:
+        """
+        Return (uuid, value) of the players ranked
+        start + 1 through start + count.
+        """
+
+        return [(uuid, -value) for value, uuid in self._order[start:start + count]]
+
+
+    def get_rank(self, uuid: str) -> Union[int, None]:
+        """
+        Return a player's 1-based rank, or None if they aren't ranked.
+        """
+
+        value = self._values.get(uuid)
+
+        if value is None:
+            return None
+
+        return bisect_left(self._order, (-value, uuid)) + 1
+
+
+class Leaderboard():
+    """
+    An ordered index per metric, kept up to date as snapshots change
+    (through the snapshot index's listeners) and as the proficiency
+    file changes (by diffing each player's proficiencies against the
+    last read), so ranking a page never has to sort every player.
+    """
+
+    def __init__(self, snapshot_index: SnapshotIndex, proficiency_file: str):
+        self.snapshot_index: SnapshotIndex = snapshot_index
+        self.proficiency_file: str = proficiency_file
+
+        self.indexes: dict = {metric: MetricIndex() for metric in METRICS}
+        self._lock: threading.Lock = threading.Lock()
+
+        # uuid -> {metric: value} as of the last proficiency file read
+        self._proficiencies: dict = {}
+        self._proficiency_version = None
+
+        snapshot_index.add_listener(self._on_snapshot_changed)
+
+
+    def _on_snapshot_changed(self, uuid: str, snapshot: Union[dict, None]) -> None:
+        with self._lock:
+            for metric in SNAPSHOT_METRICS:
+                value = snapshot.get(metric) if snapshot else None
+
+                if isinstance(value, (int, float)):
+                    self.indexes[metric].set(uuid, value)
+
+                else:
+                    self.indexes[metric].remove(uuid)
+
+
+    def _refresh_proficiencies(self) -> None:
+        """
+        Update the proficiency indexes with the players
+        whose proficiencies changed since the last read.
+        Must be called with the lock held.
+        """
+
+        version = nbt.get_file_version(self.proficiency_file)
+
+        if version == self._proficiency_version:
+            return
+
+        data = nbt.read_nbt(self.proficiency_file)["data"]
+
+        # uuid -> {metric: value}
+        players: dict = {
+            uuid: {f"proficiency.{prof}": value.value for prof, value in data[uuid].items()}
+            for uuid in data
+        }
+
+        for uuid in self._proficiencies.keys() - players.keys():
+            for metric in self._proficiencies[uuid]:
+                if metric in self.indexes:
+                    self.indexes[metric].remove(uuid)
+
+        for uuid, values in players.items():
+            old_values: dict = self._proficiencies.get(uuid, {})
+
+            if values == old_values:
+                continue
+
+            for metric in old_values.keys() - values.keys():
+                if metric in self.indexes:
+                    self.indexes[metric].remove(uuid)
+
+            for metric, value in values.items():
+                if metric in self.indexes:
+                    self.indexes[metric].set(uuid, value)
+
+        self._proficiencies = players
+        self._proficiency_version = version
+
+
+    def refresh(self) -> None:
+        """
+        Bring every index up to date with the world files.
+        """
+
+        self.snapshot_index.refresh()
+
+        with self._lock:
+            self._refresh_proficiencies()
+
+
+    def get_page(self, metric: str, page: int, page_size: int = 10) -> tuple:
+        """
+        Return a page of a metric's leaderboard as a list of
+        (rank, player name, value), and the number of pages.
+        """
+
+        self.refresh()
+
+        with self._lock:
+            index: MetricIndex = self.indexes[metric]
+            start: int = (page - 1) * page_size
+            page_count: int = max(1, -(-len(index) // page_size))
+
+            page_rows: list = index.get_range(start, page_size)
+
+        # names are looked up once the lock is released, since the snapshot
+        # index holds its own lock while calling _on_snapshot_changed
+        rows: list = []
+        for offset, (uuid, value) in enumerate(page_rows):
+            rows.append((start + offset + 1, self.get_name(uuid), value))
+
+        return (rows, page_count)
+
+
+    def get_name(self, uuid: str) -> str:
+        snapshot: Union[dict, None] = self.snapshot_index.get(uuid)
+
+        if snapshot:
+            return snapshot["playerNickname"]
+
+        return uuid
+
+
+LEADERBOARD: Leaderboard = Leaderboard(SNAPSHOT_INDEX, PROFICIENCY_FILE)
+
+
+def format_metric_value(metric: str, value) -> str:
+    """
+    Return a metric's value the way it's shown elsewhere in the bot.
+    """
+
+    if metric in PROFICIENCY_METRICS:
+        return f"{value / 100}%"
+
+    return str(value)
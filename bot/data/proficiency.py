@@ -1,6 +1,8 @@
 # Project imports
 import util.nbt as nbt
 import util.player as player
+import util.uuids as uuids
+from util.views import VIEW_CACHE
 
 # Other imports
 import os
@@ -19,14 +21,24 @@ def get_player_proficiency_data(username: str):
     Returns a dictionary of a single player's proficiency values.
     """
 
-    nbt_data = nbt.read_nbt(FILE_DATA)
-
     # Retrieve player UUID
     playerUUID = player.get_uuid_from_username(username)
 
     # Guard clause
     if not playerUUID:
         return None
+
+    versions: tuple = (nbt.get_file_version(FILE_DATA),)
+
+    return VIEW_CACHE.get("proficiency", uuids.parse(playerUUID), versions, lambda: build_player_proficiency_data(playerUUID))
+
+
+def build_player_proficiency_data(playerUUID: str) -> dict:
+    """
+    Formats a single player's proficiency values given their UUID.
+    """
+
+    nbt_data = nbt.read_nbt(FILE_DATA)
     
     prof_data: dict = {}
     
@@ -0,0 +1,337 @@
+# Project imports
+from data.snapshots import SNAPSHOT_INDEX, SnapshotIndex
+
+# Other imports
+import threading
+from array import array
+from typing import Union
+
+
+# snapshot fields holding a player's progression
+KINDS: tuple = ("researches", "talents", "abilities")
+
+# kinds that have a level for each name
+LEVELLED_KINDS: tuple = ("talents", "abilities")
+
+
+def iter_bits(bits: int):
+    """
+    Yield the positions of the set bits of an int, lowest first.
+    """
+
+    while bits:
+        lowest: int = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class Catalogue():
+    """
+    Every name of one kind (research, talent or ability) seen in any
+    snapshot, each interned to a fixed bit position.
+    """
+
+    def __init__(self):
+        self.names: list = []
+        self.ids: dict = {}
+
+
+    def intern(self, name: str) -> int:
+        name_id: Union[int, None] = self.ids.get(name)
+
+        if name_id is None:
+            name_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+
+        return name_id
+
+
+    def get_names(self, bits: int) -> list:
+        return [self.names[name_id] for name_id in iter_bits(bits)]
+
+
+class ProgressionIndex():
+    """
+    Every player's researches, talents and abilities as bitsets over
+    interned catalogues, kept up to date through the snapshot index's
+    listeners.
+
+    Each player has a bitset per kind, and their talent and ability
+    levels are kept in an int array indexed by catalogue position. Each
+    name also has a bitset of the players (by row) that have it, so
+    server-wide questions like who hasn't researched a mod are a single
+    mask. Rows of removed players are reused.
+    """
+
+    def __init__(self, snapshot_index: SnapshotIndex):
+        self.snapshot_index: SnapshotIndex = snapshot_index
+
+        self.catalogues: dict = {kind: Catalogue() for kind in KINDS}
+
+        # kind -> {uuid: bitset of names}
+        self.player_bits: dict = {kind: {} for kind in KINDS}
+
+        # kind -> {uuid: array of levels by name position}
+        self.player_levels: dict = {kind: {} for kind in LEVELLED_KINDS}
+
+        # kind -> list of bitsets of player rows, by name position
+        self.name_bits: dict = {kind: [] for kind in KINDS}
+
+        # uuid -> row, row -> uuid, and the bitset of every row in use
+        self._rows: dict = {}
+        self._row_uuids: list = []
+        self._free_rows: list = []
+        self._all_rows: int = 0
+
+        self._lock: threading.Lock = threading.Lock()
+
+        snapshot_index.add_listener(self._on_snapshot_changed)
+
+
+    def _on_snapshot_changed(self, uuid: str, snapshot: Union[dict, None]) -> None:
+        with self._lock:
+            if snapshot is None:
+                self._remove_player(uuid)
+
+            else:
+                self._set_player(uuid, snapshot)
+
+
+    def _get_row(self, uuid: str) -> int:
+        row: Union[int, None] = self._rows.get(uuid)
+
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+                self._row_uuids[row] = uuid
+
+            else:
+                row = len(self._row_uuids)
+                self._row_uuids.append(uuid)
+
+            self._rows[uuid] = row
+            self._all_rows |= 1 << row
+
+        return row
+
+
+    def _set_player(self, uuid: str, snapshot: dict) -> None:
+        row: int = self._get_row(uuid)
+
+        for kind in KINDS:
+            catalogue: Catalogue = self.catalogues[kind]
+            names = snapshot.get(kind) or {}
+
+            bits: int = 0
+            for name in names:
+                bits |= 1 << catalogue.intern(name)
+
+            self._set_bits(kind, uuid, row, bits)
+
+            if kind in LEVELLED_KINDS:
+                levels: array = array("i", bytes(4 * len(catalogue.names)))
+
+                for name, level in names.items():
+                    levels[catalogue.ids[name]] = level if isinstance(level, int) else 0
+
+                self.player_levels[kind][uuid] = levels
+
+
+    def _set_bits(self, kind: str, uuid: str, row: int, bits: int) -> None:
+        """
+        Store a player's bitset of a kind, flipping their row in
+        the bitsets of only the names they gained or lost.
+        """
+
+        name_bits: list = self.name_bits[kind]
+        changed: int = self.player_bits[kind].get(uuid, 0) ^ bits
+
+        name_bits.extend(0 for _ in range(len(self.catalogues[kind].names) - len(name_bits)))
+
+        for name_id in iter_bits(changed):
+            name_bits[name_id] ^= 1 << row
+
+        if bits:
+            self.player_bits[kind][uuid] = bits
+
+        else:
+            self.player_bits[kind].pop(uuid, None)
+
+
+    def _remove_player(self, uuid: str) -> None:
+        row: Union[int, None] = self._rows.pop(uuid, None)
+
+        if row is None:
+            return
+
+        for kind in KINDS:
+            self._set_bits(kind, uuid, row, 0)
+
+        for kind in LEVELLED_KINDS:
+            self.player_levels[kind].pop(uuid, None)
+
+        self._all_rows &= ~(1 << row)
+        self._free_rows.append(row)
+
+
+    def _is_held(self, kind: str, name_id: int) -> bool:
+        """
+        Return whether any current player has a name. Names stay
+        interned after their last holder is removed.
+        """
+
+        name_bits: list = self.name_bits[kind]
+
+        return name_id < len(name_bits) and bool(name_bits[name_id] & self._all_rows)
+
+
+    def get_level(self, kind: str, uuid: str, name_id: int) -> int:
+        levels: Union[array, None] = self.player_levels[kind].get(uuid)
+
+        if levels is None or name_id >= len(levels):
+            return 0
+
+        return levels[name_id]
+
+
+    def compare(self, player_uuids: list) -> dict:
+        """
+        Return, for each kind, the names every given player has, the
+        names only some of them have (with who has them), and for
+        talents and abilities every shared name whose levels differ
+        (with each player's level, in the given order).
+        """
+
+        self.snapshot_index.refresh()
+
+        comparison: dict = {}
+
+        with self._lock:
+            for kind in KINDS:
+                catalogue: Catalogue = self.catalogues[kind]
+                player_bits: list = [self.player_bits[kind].get(uuid, 0) for uuid in player_uuids]
+
+                shared: int = player_bits[0]
+                combined: int = 0
+
+                for bits in player_bits:
+                    shared &= bits
+                    combined |= bits
+
+                partial: dict = {}
+                for name_id in iter_bits(combined & ~shared):
+                    partial[catalogue.names[name_id]] = [
+                        position for position, bits in enumerate(player_bits) if bits >> name_id & 1
+                    ]
+
+                kind_comparison: dict = {
+                    "shared": catalogue.get_names(shared),
+                    "partial": partial
+                }
+
+                if kind in LEVELLED_KINDS:
+                    level_differences: dict = {}
+
+                    for name_id in iter_bits(shared):
+                        levels: list = [self.get_level(kind, uuid, name_id) for uuid in player_uuids]
+
+                        if len(set(levels)) > 1:
+                            level_differences[catalogue.names[name_id]] = levels
+
+                    kind_comparison["levels"] = level_differences
+
+                comparison[kind] = kind_comparison
+
+        return comparison
+
+
+    def get_players_without(self, kind: str, name: str) -> Union[list, None]:
+        """
+        Return the UUIDs of every player that doesn't have a research,
+        talent or ability, or None if no current player has it.
+        """
+
+        self.snapshot_index.refresh()
+
+        with self._lock:
+            name_id: Union[int, None] = self.catalogues[kind].ids.get(name)
+
+            if name_id is None or not self._is_held(kind, name_id):
+                return None
+
+            missing: int = self._all_rows & ~self.name_bits[kind][name_id]
+
+            return [self._row_uuids[row] for row in iter_bits(missing)]
+
+
+    def get_names(self, kind: str, query: str, limit: int = 25) -> list:
+        """
+        Return up to limit names of a kind containing query that a
+        current player has, for autocompletion.
+        """
+
+        query = query.strip().lower()
+
+        with self._lock:
+            names: list = [
+                name for name_id, name in enumerate(self.catalogues[kind].names)
+                if query in name.lower() and self._is_held(kind, name_id)
+            ]
+
+        return sorted(names)[:limit]
+
+
+PROGRESSION_INDEX: ProgressionIndex = ProgressionIndex(SNAPSHOT_INDEX)
+
+
+def compare_players(usernames: list) -> tuple:
+    """
+    Return the usernames that couldn't be found, and a comparison of
+    the others' researches, talents and abilities.
+    """
+
+    SNAPSHOT_INDEX.refresh()
+
+    player_uuids: list = []
+    missing: list = []
+
+    for username in usernames:
+        uuid: Union[str, None] = SNAPSHOT_INDEX.get_uuid(username, refresh=False)
+
+        if uuid:
+            player_uuids.append(uuid)
+
+        else:
+            missing.append(username)
+
+    if missing:
+        return (missing, {})
+
+    return ([], PROGRESSION_INDEX.compare(player_uuids))
+
+
+def get_players_without_research(research: str) -> Union[list, None]:
+    """
+    Return the sorted names of every player that hasn't researched
+    a mod, or None if nobody has researched it.
+    """
+
+    player_uuids: Union[list, None] = PROGRESSION_INDEX.get_players_without("researches", research)
+
+    if player_uuids is None:
+        return None
+
+    return sorted(
+        (snapshot["playerNickname"] for snapshot in map(SNAPSHOT_INDEX.get, player_uuids) if snapshot),
+        key=str.lower
+    )
+
+
+def get_research_names(query: str) -> list:
+    """
+    Return names of researches containing query, for autocompletion.
+    """
+
+    SNAPSHOT_INDEX.refresh()
+
+    return PROGRESSION_INDEX.get_names("researches", query)
@@ -0,0 +1,249 @@
+# Project imports
+import util.nbt as nbt
+from data.leaderboard import SNAPSHOT_METRICS, PROFICIENCIES
+from data.proficiency import FILE_DATA as PROFICIENCY_FILE
+from data.snapshots import SNAPSHOT_INDEX, SnapshotIndex
+
+# Other imports
+import threading
+from array import array
+from typing import Union
+
+try:
+    import numpy
+
+except ImportError:
+    numpy = None
+
+
+MISSING: int = -1
+
+LEVEL_BUCKET_SIZE: int = 10
+PERCENTILES: tuple = (25, 50, 75, 90, 99)
+
+
+class StatsTable():
+    """
+    Numeric snapshot and proficiency fields of every player, stored
+    as one compact int array per field with a row per player.
+
+    Rows are patched as snapshots are added or removed (through the
+    snapshot index's listeners) and as players' proficiencies change,
+    and rows left empty by removed players are reused. Missing values
+    are stored as -1. Aggregates are vectorized with numpy when it's
+    installed, and computed in plain Python otherwise.
+    """
+
+    def __init__(self, snapshot_index: SnapshotIndex, proficiency_file: str):
+        self.snapshot_index: SnapshotIndex = snapshot_index
+        self.proficiency_file: str = proficiency_file
+
+        self.snapshot_columns: tuple = tuple(SNAPSHOT_METRICS)
+        self.proficiency_columns: tuple = PROFICIENCIES
+        self.columns: dict = {name: array("i") for name in self.snapshot_columns + self.proficiency_columns}
+
+        # uuid -> row
+        self._rows: dict = {}
+        self._free_rows: list = []
+        self._lock: threading.Lock = threading.Lock()
+
+        self._proficiency_version = None
+
+        snapshot_index.add_listener(self._on_snapshot_changed)
+
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+    def _get_values(self, uuid: str, names: tuple) -> dict:
+        row: Union[int, None] = self._rows.get(uuid)
+
+        if row is None:
+            return {}
+
+        return {name: self.columns[name][row] for name in names if self.columns[name][row] != MISSING}
+
+
+    def _patch(self, uuid: str, names: tuple, values: dict) -> None:
+        """
+        Overwrite a player's values for the given columns, adding
+        their row if needed and freeing it once it's empty.
+        """
+
+        row: Union[int, None] = self._rows.get(uuid)
+
+        if row is None:
+            if not values:
+                return
+
+            if self._free_rows:
+                row = self._free_rows.pop()
+
+            else:
+                row = len(self.columns[names[0]])
+
+                for column in self.columns.values():
+                    column.append(MISSING)
+
+            self._rows[uuid] = row
+
+        for name in names:
+            self.columns[name][row] = values.get(name, MISSING)
+
+        if all(column[row] == MISSING for column in self.columns.values()):
+            del self._rows[uuid]
+            self._free_rows.append(row)
+
+
+    def _on_snapshot_changed(self, uuid: str, snapshot: Union[dict, None]) -> None:
+        values: dict = {}
+
+        if snapshot:
+            values = {
+                name: int(snapshot[name]) for name in self.snapshot_columns
+                if isinstance(snapshot.get(name), (int, float))
+            }
+
+        with self._lock:
+            self._patch(uuid, self.snapshot_columns, values)
+
+
+    def _refresh_proficiencies(self) -> None:
+        """
+        Patch the rows of players whose proficiencies changed
+        since the last read. Must be called with the lock held.
+        """
+
+        version = nbt.get_file_version(self.proficiency_file)
+
+        if version == self._proficiency_version:
+            return
+
+        data = nbt.read_nbt(self.proficiency_file)["data"]
+
+        for uuid in set(self._rows) - set(data):
+            self._patch(uuid, self.proficiency_columns, {})
+
+        for uuid in data:
+            values: dict = {prof: value.value for prof, value in data[uuid].items() if prof in self.proficiency_columns}
+
+            if values != self._get_values(uuid, self.proficiency_columns):
+                self._patch(uuid, self.proficiency_columns, values)
+
+        self._proficiency_version = version
+
+
+    def refresh(self) -> None:
+        """
+        Bring the table up to date with the world files.
+        """
+
+        self.snapshot_index.refresh()
+
+        with self._lock:
+            self._refresh_proficiencies()
+
+
+    def _get_column(self, name: str):
+        """
+        Return a column's values without the missing ones, as a numpy
+        array if numpy is installed or a list otherwise.
+        """
+
+        column: array = self.columns[name]
+
+        if numpy is None:
+            return [value for value in column if value != MISSING]
+
+        if not column:
+            return numpy.zeros(0, dtype=numpy.intc)
+
+        values = numpy.frombuffer(column, dtype=numpy.intc)
+        return values[values != MISSING]
+
+
+    def get_stats(self) -> dict:
+        """
+        Return server-wide aggregates: the vault level distribution,
+        vaults run and how they ended, and average proficiencies.
+        """
+
+        self.refresh()
+
+        with self._lock:
+            levels = self._get_column("vaultLevel")
+            players: int = len(levels)
+
+            completed: int = get_sum(self._get_column("completed"))
+            survived: int = get_sum(self._get_column("survived"))
+            failed: int = get_sum(self._get_column("failed"))
+            total: int = completed + survived + failed
+
+            proficiency_averages: dict = {}
+            for prof in self.proficiency_columns:
+                values = self._get_column(prof)
+
+                if len(values):
+                    proficiency_averages[prof] = get_sum(values) / len(values)
+
+            return {
+                "players": players,
+                "level_average": get_sum(levels) / players if players else 0,
+                "level_percentiles": dict(zip(PERCENTILES, get_percentiles(levels, PERCENTILES))) if players else {},
+                "level_histogram": get_histogram(levels, LEVEL_BUCKET_SIZE),
+                "vaults_total": total,
+                "vaults_average": total / players if players else 0,
+                "completed_rate": completed / total if total else 0,
+                "survived_rate": survived / total if total else 0,
+                "failed_rate": failed / total if total else 0,
+                "proficiency_averages": proficiency_averages
+            }
+
+
+def get_sum(values) -> int:
+    if numpy is None:
+        return sum(values)
+
+    return int(values.sum(dtype=numpy.int64))
+
+
+def get_percentiles(values, percents: tuple) -> list:
+    """
+    Return the given percentiles of a non-empty column, interpolating
+    between values the same way numpy does by default.
+    """
+
+    if numpy is not None:
+        return [float(value) for value in numpy.percentile(values, percents)]
+
+    ordered: list = sorted(values)
+    percentiles: list = []
+
+    for percent in percents:
+        position: float = (len(ordered) - 1) * percent / 100
+        lower: int = int(position)
+        upper: int = min(lower + 1, len(ordered) - 1)
+
+        percentiles.append(ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower))
+
+    return percentiles
+
+
+def get_histogram(values, bucket_size: int) -> list:
+    """
+    Return (bucket start, count) of every non-empty bucket of a column.
+    """
+
+    if numpy is not None:
+        counts = numpy.bincount(values // bucket_size)
+        return [(int(bucket) * bucket_size, int(counts[bucket])) for bucket in numpy.flatnonzero(counts)]
+
+    counts: dict = {}
+    for value in values:
+        counts[value // bucket_size] = counts.get(value // bucket_size, 0) + 1
+
+    return [(bucket * bucket_size, counts[bucket]) for bucket in sorted(counts)]
+
+
+SERVER_STATS: StatsTable = StatsTable(SNAPSHOT_INDEX, PROFICIENCY_FILE)
@@ -1,16 +1,246 @@
+# Project imports
+from main import SNAPSHOT_MAX_AGE
+from util.events import BUS, SNAPSHOTS_CHANGED
+from util.timing import TIMINGS, SNAPSHOT_READ
+
 # Other imports
 import os
 import json
+import threading
+import time
+from typing import Union
 
 
-def get_player_snapshots() -> list:
+SNAPSHOT_DIRECTORY: str = "playerSnapshots"
+
+
+class SnapshotIndex():
+    """
+    In-memory index of every player snapshot in the
+    playerSnapshots directory.
+
+    Snapshots are keyed by UUID, with nickname -> UUID
+    maps (exact and lowercase) for username lookups.
+    Refreshing only re-reads files whose mtime changed
+    since the last refresh, and drops deleted ones. The
+    directory itself is only scanned again once the index is
+    invalidated (by the file watcher) or older than max_age
+    seconds, so lookups are plain dict reads.
+
+    Listeners are told about every snapshot added or removed,
+    so other indexes can be kept up to date incrementally.
+
+    Refreshes can run on several worker threads at once, so reads
+    go through the lock-holding accessors below rather than the
+    dicts themselves.
+    """
+
+    def __init__(self, directory: str, max_age: float = 5):
+        self.directory: str = directory
+        self.max_age: float = max_age
+
+        self.snapshots: dict = {}
+        self.uuid_by_name: dict = {}
+        self.uuid_by_lower_name: dict = {}
+
+        # file name -> (mtime, UUID stored in that file)
+        self._files: dict = {}
+        self._lock: threading.Lock = threading.Lock()
+
+        # whether the directory must be scanned on the next refresh, and when it last was
+        self._stale: bool = True
+        self._scanned_at: float = 0
+
+        self._listeners: list = []
+
+
+    def add_listener(self, listener) -> None:
+        """
+        Call listener(uuid, snapshot) whenever a snapshot is added, and
+        listener(uuid, None) whenever one is removed. A changed snapshot
+        is removed then added again. The listener is first called for
+        every snapshot already indexed.
+        """
+
+        with self._lock:
+            self._listeners.append(listener)
+
+            for uuid, snapshot in self.snapshots.items():
+                listener(uuid, snapshot)
+
+
+    def invalidate(self) -> None:
+        """
+        Make the next refresh scan the directory, for when
+        snapshot files are known to have changed.
+        """
+
+        self._stale = True
+
+
+    def is_fresh(self) -> bool:
+        return not self._stale and time.monotonic() - self._scanned_at < self.max_age
+
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Bring the index up to date with the snapshot directory, if it
+        was invalidated or last scanned more than max_age seconds ago
+        (or always, with force=True).
+        """
+
+        if not force and self.is_fresh():
+            return
+
+        with self._lock:
+            # another thread may have scanned while this one waited for the lock
+            if not force and self.is_fresh():
+                return
+
+            # cleared first, so changes reported mid-scan trigger another one
+            self._stale = False
+
+            with TIMINGS.span(SNAPSHOT_READ):
+                self._scan()
+
+            self._scanned_at = time.monotonic()
+
+
+    def _scan(self) -> None:
+        seen: set = set()
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+
+                try:
+                    mtime: int = entry.stat().st_mtime_ns
+
+                # deleted since it was listed
+                except FileNotFoundError:
+                    continue
+
+                seen.add(entry.name)
+
+                stored = self._files.get(entry.name)
+                if stored and stored[0] == mtime:
+                    continue
+
+                try:
+                    with open(entry.path, "r") as f:
+                        snapshot: dict = json.load(f)
+
+                # file caught mid-write or deleted since it was listed, pick it up next refresh
+                except (json.JSONDecodeError, FileNotFoundError):
+                    self._stale = True
+                    continue
+
+                if stored:
+                    self._remove(stored[1])
 
-    snapshots: list = []
+                self._add(snapshot)
+                self._files[entry.name] = (mtime, snapshot["playerUUID"])
+
+        for file_name in set(self._files) - seen:
+            self._remove(self._files.pop(file_name)[1])
+
+
+    def _add(self, snapshot: dict) -> None:
+        uuid: str = snapshot["playerUUID"]
+        name: str = snapshot["playerNickname"]
+
+        self.snapshots[uuid] = snapshot
+        self.uuid_by_name[name] = uuid
+        self.uuid_by_lower_name[name.lower()] = uuid
+
+        for listener in self._listeners:
+            listener(uuid, snapshot)
+
+
+    def _remove(self, uuid: str) -> None:
+        snapshot: Union[dict, None] = self.snapshots.pop(uuid, None)
+
+        if not snapshot:
+            return
+
+        name: str = snapshot["playerNickname"]
+
+        if self.uuid_by_name.get(name) == uuid:
+            del self.uuid_by_name[name]
+
+        if self.uuid_by_lower_name.get(name.lower()) == uuid:
+            del self.uuid_by_lower_name[name.lower()]
+
+        for listener in self._listeners:
+            listener(uuid, None)
+
+
+    def get_uuid(self, username: str, refresh: bool = True) -> Union[str, None]:
+        """
+        Return a player's UUID given their username, falling back
+        to a case-insensitive match.
+
+        Refreshing is free unless the index is stale; pass
+        refresh=False to skip even that check.
+        """
+
+        if refresh:
+            self.refresh()
+
+        with self._lock:
+            if uuid := self.uuid_by_name.get(username):
+                return uuid
+
+            return self.uuid_by_lower_name.get(username.lower())
+
+
+    def get_snapshot(self, username: str) -> Union[dict, None]:
+        """
+        Return a player's snapshot given their username.
+        """
+
+        uuid: Union[str, None] = self.get_uuid(username)
+
+        if uuid:
+            return self.get(uuid)
+
+
+    def get(self, uuid: str) -> Union[dict, None]:
+        """
+        Return a player's snapshot given their UUID, without refreshing.
+        """
+
+        with self._lock:
+            return self.snapshots.get(uuid)
+
+
+    def items(self) -> list:
+        """
+        Return a list of every (UUID, snapshot) pair, without refreshing.
+        """
+
+        with self._lock:
+            return list(self.snapshots.items())
+
+
+SNAPSHOT_INDEX: SnapshotIndex = SnapshotIndex(SNAPSHOT_DIRECTORY, SNAPSHOT_MAX_AGE)
+
+
+async def on_snapshots_changed(paths: set) -> None:
+    SNAPSHOT_INDEX.invalidate()
+
+
+# subscribed on import, ahead of the cogs, so the index is already
+# invalidated by the time their own subscribers read from it
+BUS.subscribe(SNAPSHOTS_CHANGED, on_snapshots_changed)
+
+
+def get_player_snapshots() -> list:
+    """
+    Return a list of every player snapshot.
+    """
 
-    files: list = os.listdir("playerSnapshots")
-    
-    for file in files:
-        with open(f"playerSnapshots/{file}", "r") as f:
-            snapshots.append(json.load(f))
+    SNAPSHOT_INDEX.refresh()
 
-    return snapshots
\ No newline at end of file
+    return [snapshot for _, snapshot in SNAPSHOT_INDEX.items()]
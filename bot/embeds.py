@@ -1,5 +1,6 @@
 # Project Imports
 from image import EmbedWithImage, get_player_head_file_ign
+from util.timing import TIMINGS, EMBED_BUILD
 
 # Other imports
 import discord
@@ -10,6 +11,7 @@ from typing import Union
 class PlayerListOptions(Enum):
     ONLINE = 1
     IN_VAULT = 2
+    MISSING_RESEARCH = 3
 
 def get_starter_embed(title: str, ign: str) -> tuple:
     """
@@ -27,6 +29,7 @@ def get_starter_embed(title: str, ign: str) -> tuple:
     return (embed, head_render)
 
 
+@TIMINGS.timed(EMBED_BUILD)
 def get_bounty_embed(title: str, player_bounty_data: list, ign: str) -> EmbedWithImage:
     """
     Return an embed with given title and data on
@@ -90,6 +93,7 @@ def get_bounty_embed(title: str, player_bounty_data: list, ign: str) -> EmbedWit
     return embed_obj
 
 
+@TIMINGS.timed(EMBED_BUILD)
 def get_player_prof_embed(title: str, ign: str, prof_data) -> EmbedWithImage:
     """
     Return an embed with given title and data on
@@ -113,6 +117,7 @@ def get_player_prof_embed(title: str, ign: str, prof_data) -> EmbedWithImage:
     return embed_obj
 
 
+@TIMINGS.timed(EMBED_BUILD)
 def get_vault_stats_embed(title: str, ign: str, vault_stats: dict) -> EmbedWithImage:
     """
     Return an embed with vault stats for given player
@@ -139,11 +144,13 @@ def get_vault_stats_embed(title: str, ign: str, vault_stats: dict) -> EmbedWithI
     return embed_obj
 
 
-def get_players_embed(list_option: PlayerListOptions, players: list) -> discord.Embed:
+@TIMINGS.timed(EMBED_BUILD)
+def get_players_embed(list_option: PlayerListOptions, players: list, subject: str = "") -> discord.Embed:
     """
     Returns an embed that lists all players
     currently representing given metric
-    (i.e. online, in a vault).
+    (i.e. online, in a vault, missing the
+    research given as subject).
     """
 
     if list_option == PlayerListOptions.ONLINE:
@@ -154,6 +161,10 @@ def get_players_embed(list_option: PlayerListOptions, players: list) -> discord.
         title: str = "Players in vault"
         empty_description: str = "There are currently no players in a vault!"
 
+    elif list_option == PlayerListOptions.MISSING_RESEARCH:
+        title: str = f"Players without {subject}"
+        empty_description: str = f"Every player has researched {subject}!"
+
     embed: discord.Embed = discord.Embed(title=title)
     embed.color = 0x7c1bd1
 
@@ -162,6 +173,214 @@ def get_players_embed(list_option: PlayerListOptions, players: list) -> discord.
     else:
         embed.description = "\n".join(players)
 
+        # discord allows at most 4096 characters per description
+        if len(embed.description) > 4000:
+            shown: list = embed.description[:4000].split("\n")[:-1]
+            embed.description = "\n".join(shown) + f"\n...and {len(players) - len(shown)} more"
+
+    return embed
+
+
+@TIMINGS.timed(EMBED_BUILD)
+def get_black_market_offers_embed(query: str, offers: list, omitted_items: int = 0) -> discord.Embed:
+    """
+    Returns an embed listing which players' black
+    markets offer items matching a search.
+    """
+
+    embed: discord.Embed = discord.Embed(title=f"Black Market offers of {query}")
+    embed.color = 0x7c1bd1
+
+    if not offers:
+        embed.description = "Nobody's black market currently offers that item!"
+        return embed
+
+    # discord allows at most 25 fields per embed
+    for offer in offers[:25]:
+        embed.add_field(
+            name=f"{offer['player']} - x{offer['amount']} {offer['item']}",
+            value=f"Costs {offer['cost']} soul shards, resets <t:{offer['reset'] // 1000}:R>",
+            inline=False
+        )
+
+    footer_lines: list = []
+
+    if len(offers) > 25:
+        footer_lines.append(f"Showing the 25 cheapest of {len(offers)} offers")
+
+    if omitted_items:
+        footer_lines.append(f"{omitted_items} more matching items weren't searched, try a more specific name")
+
+    if footer_lines:
+        embed.set_footer(text="\n".join(footer_lines))
+
+    return embed
+
+
+@TIMINGS.timed(EMBED_BUILD)
+def get_bounty_search_embed(title: str, results: list) -> discord.Embed:
+    """
+    Returns an embed listing bounties found across players,
+    given (player name, bounty) pairs.
+    """
+
+    embed: discord.Embed = discord.Embed(title=title)
+    embed.color = 0x7c1bd1
+
+    if not results:
+        embed.description = "Nobody currently has a bounty like that!"
+        return embed
+
+    shown: int = 0
+
+    # discord allows at most 25 fields per embed
+    for player_name, bounty in results[:25]:
+        bounty_progress: int = int(bounty["task"]["amount_obtained"])
+
+        rewards_str: str = ", ".join(f"{reward['id']}: {reward['count']}" for reward in bounty["reward"]["items"])
+
+        field_str: str = f"**{bounty['task']['type']}**\n"
+        field_str += f"{bounty['task']['id']}: {bounty_progress} / {bounty['task']['amount']}\n"
+        field_str += f"Rewards: {rewards_str}\nExperience: {bounty['reward']['vault_experience']}"
+
+        # discord allows at most 1024 characters per field
+        if len(field_str) > 1024:
+            field_str = field_str[:1020] + "..."
+
+        field_name: str = f"{player_name} - {bounty['availability'].title()}"
+
+        # discord allows at most 6000 characters per embed, leave room for the footer
+        if len(embed) + len(field_name) + len(field_str) > 5900:
+            break
+
+        embed.add_field(name=field_name, value=field_str, inline=False)
+        shown += 1
+
+    if len(results) > shown:
+        embed.set_footer(text=f"Showing {shown} of {len(results)} bounties")
+
+    return embed
+
+
+@TIMINGS.timed(EMBED_BUILD)
+def get_compare_embed(usernames: list, comparison: dict) -> discord.Embed:
+    """
+    Returns an embed comparing several players' researches,
+    talents and abilities.
+    """
+
+    title: str = " vs ".join(usernames)
+
+    # discord allows at most 256 characters per title
+    if len(title) > 256:
+        title = title[:253] + "..."
+
+    embed: discord.Embed = discord.Embed(title=title)
+    embed.color = 0x7c1bd1
+
+    for kind in ("researches", "talents", "abilities"):
+        kind_comparison: dict = comparison[kind]
+
+        # group names by which players have them
+        partial_groups: dict = {}
+        for name, positions in kind_comparison["partial"].items():
+            partial_groups.setdefault(tuple(positions), []).append(name)
+
+        lines: list = []
+
+        if kind_comparison["shared"]:
+            lines.append(f"__Everyone__: {', '.join(kind_comparison['shared'])}")
+
+        for positions, names in partial_groups.items():
+            holders: str = ", ".join(usernames[position] for position in positions)
+            lines.append(f"__{holders} only__: {', '.join(names)}")
+
+        for name, levels in kind_comparison.get("levels", {}).items():
+            lines.append(f"{name}: {' / '.join(str(level) for level in levels)}")
+
+        field_str: str = "\n".join(lines) or f"Nobody has any {kind}!"
+
+        # discord allows at most 1024 characters per field
+        if len(field_str) > 1024:
+            field_str = field_str[:1020] + "..."
+
+        embed.add_field(name=kind.title(), value=field_str, inline=False)
+
+    return embed
+
+
+@TIMINGS.timed(EMBED_BUILD)
+def get_leaderboard_embed(title: str, rows: list, page: int, page_count: int) -> discord.Embed:
+    """
+    Returns an embed listing a page of a leaderboard,
+    given rows of (rank, player name, formatted value).
+    """
+
+    embed: discord.Embed = discord.Embed(title=title)
+    embed.color = 0x7c1bd1
+
+    if not rows:
+        embed.description = "There are no players on this page!"
+    else:
+        embed.description = "\n".join(f"**{rank}.** {name} - {value}" for rank, name, value in rows)
+
+    embed.set_footer(text=f"Page {page}/{page_count}")
+
+    return embed
+
+
+@TIMINGS.timed(EMBED_BUILD)
+def get_server_stats_embed(stats: dict) -> discord.Embed:
+    """
+    Returns an embed summarizing every player's
+    vault levels, vaults and proficiencies.
+    """
+
+    embed: discord.Embed = discord.Embed(title="Server Stats")
+    embed.color = 0x7c1bd1
+
+    if not stats["players"]:
+        embed.description = "No players have joined the server yet!"
+        return embed
+
+    embed.description = f"{stats['players']} players"
+
+    percentiles: dict = stats["level_percentiles"]
+    level_desc: str = f"""
+    • {stats['level_average']:.1f} average
+    • {percentiles[50]:.0f} median
+    • {percentiles[25]:.0f} - {percentiles[75]:.0f} middle half
+    • {percentiles[90]:.0f} top 10%
+    • {percentiles[99]:.0f} top 1%
+    """
+    embed.add_field(name="Vault Levels", value=level_desc)
+
+    vaults_desc: str = f"""
+    • {stats['vaults_total']} total
+    • {stats['vaults_average']:.1f} per player
+    • {stats['completed_rate']:.0%} completed
+    • {stats['survived_rate']:.0%} survived
+    • {stats['failed_rate']:.0%} failed
+    """
+    embed.add_field(name="Vaults Run", value=vaults_desc)
+
+    histogram: list = stats["level_histogram"]
+    largest: int = max(count for _, count in histogram)
+
+    histogram_lines: list = []
+    for start, count in histogram:
+        bar: str = "█" * max(1, round(count / largest * 20))
+        histogram_lines.append(f"{start:>3}+ {bar} {count}")
+
+    embed.add_field(name="Level Distribution", value="```\n" + "\n".join(histogram_lines) + "\n```", inline=False)
+
+    prof_desc: str = "\n".join(
+        f"__{prof.title()}__ - {average / 100:.2f}%" for prof, average in stats["proficiency_averages"].items()
+    )
+
+    if prof_desc:
+        embed.add_field(name="Average Proficiencies", value=prof_desc, inline=False)
+
     return embed
 
 
@@ -179,6 +398,9 @@ def get_help_embed(ctx: discord.ApplicationContext) -> discord.Embed:
 
     common_cmd_desc: str = """
     `Online` - See list of players currently on minecraft server
+    `Leaderboard` - See who ranks highest in vault level, vaults run or proficiencies
+    `Server-stats` - See vault level distribution, vaults run and average proficiencies across all players
+    `Missing-research` - See which players haven't researched a mod yet
     """
     embed.add_field(name="Common commands", value=common_cmd_desc, inline=False)
 
@@ -191,11 +413,14 @@ def get_help_embed(ctx: discord.ApplicationContext) -> discord.Embed:
 
     info_cmd_desc: str = """
     `Stats` - View player talents, abilities and researches
+    `Compare` - Compare two or more players' talents, abilities and researches
     `Vault-stats` - See player level and info on number of vaults ran
     `Proficiency` - View player proficiency stats
     `Crafted-modifiers` - View player's discovered craftable modifiers
     `BM` - View player's current black market offerings
+    `BM-find` - See whose black market currently offers an item
     `Bounty` - View player's current bounty listings
+    `Bounty-find` - See who has a bounty rewarding an item or requiring a task
     """
     embed.add_field(name="Vault info commands", value=info_cmd_desc, inline=False)
 
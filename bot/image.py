@@ -1,11 +1,18 @@
 # Project imports
 import util.player as player
+import util.uuids as uuids
+from util.timing import TIMINGS, HEAD_FETCH
 
 # Other Imports
+import aiohttp
+import asyncio
+import concurrent.futures
 import discord
+import io
 import os
-import requests
-import shutil
+import threading
+import time
+from collections import OrderedDict
 from sys import platform
 from typing import Union
 
@@ -35,43 +42,244 @@ class EmbedWithImage():
 
 
 
-def download_player_head(uuid: str) -> bool:
+class PlayerHeadService():
     """
-    Downloads an image of the given player's
-    rendered minecraft head.
+    Provides rendered player head images.
 
-    Returns whether file was successfully
-    downloaded or not.
+    Heads are served from an in-memory LRU of PNG bytes, then from
+    the heads directory on disk, and only downloaded from crafatar
+    when neither has them. Failed downloads are remembered for a
+    while so they aren't retried on every command.
     """
 
-    # update to use standardized utils file later
+    URL: str = "https://crafatar.com/renders/head/{uuid}?overlay"
 
-    
-    img_file_path = os.path.join(file_path, uuid)
-    img_file_path += ".png"
-    
+    def __init__(self, directory: str, memory_size: int = 256, failure_ttl: float = 600, download_timeout: float = 10):
+        self.directory: str = directory
+        self.memory_size: int = memory_size
+        self.failure_ttl: float = failure_ttl
+        self.download_timeout: float = download_timeout
+
+        self._memory: OrderedDict = OrderedDict()
+        self._failed: dict = {}
+        self._saved: Union[set, None] = None
+        self._lock: threading.Lock = threading.Lock()
+
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+        self._session: Union[aiohttp.ClientSession, None] = None
+        self._downloads: dict = {}
+
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Bind the service to the bot's event loop, which
+        all downloads are run on.
+        """
+
+        self._loop = loop
+
+
+    async def close(self) -> None:
+        """
+        Close the HTTP session used for downloads.
+        """
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+    @TIMINGS.timed(HEAD_FETCH)
+    def get_png(self, uuid: str) -> Union[bytes, None]:
+        """
+        Return the PNG bytes of a player's head render, or None
+        if it isn't available.
+
+        Must not be called from the event loop's thread when the
+        head isn't cached, as it waits on the download.
+        """
+
+        # dashed and undashed UUIDs share one cache entry
+        uuid = uuids.normalize(uuid)
+
+        if (png := self._get_cached(uuid)) is not None:
+            return png
+
+        if self._has_failed(uuid):
+            return None
 
-    URL: str = f"https://crafatar.com/renders/head/{uuid}?overlay"
+        try:
+            asyncio.get_running_loop()
 
-    response = requests.get(URL, stream=True)
+        # not on an event loop, so it's fine to wait on the download
+        except RuntimeError:
+            pass
 
-    if response.status_code == 200:
-        with open(img_file_path, 'wb') as f:
-            shutil.copyfileobj(response.raw, f)
+        # on the event loop, download in the background for next time
+        else:
+            asyncio.ensure_future(self.fetch(uuid))
+            return None
+
+        if self._loop is not None and self._loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(self.fetch(uuid), self._loop)
+
+            try:
+                return future.result(self.download_timeout)
+
+            except concurrent.futures.TimeoutError:
+                return None
+
+        return asyncio.run(self.fetch(uuid))
+
+
+    def _get_cached(self, uuid: str) -> Union[bytes, None]:
+        with self._lock:
+            if uuid in self._memory:
+                self._memory.move_to_end(uuid)
+                return self._memory[uuid]
+
+            if self._saved is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._saved = {file[:-len(".png")] for file in os.listdir(self.directory) if file.endswith(".png")}
+
+            if uuid not in self._saved:
+                return None
+
+        try:
+            with open(self._get_path(uuid), "rb") as f:
+                png: bytes = f.read()
+
+        # deleted or unreadable since the directory was listed, so download it again
+        except OSError:
+            with self._lock:
+                self._saved.discard(uuid)
+
+            return None
+
+        self._remember(uuid, png)
+
+        return png
+
+
+    def _remember(self, uuid: str, png: bytes) -> None:
+        with self._lock:
+            self._memory[uuid] = png
+            self._memory.move_to_end(uuid)
+
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+
+    def _has_failed(self, uuid: str) -> bool:
+        expiry: Union[float, None] = self._failed.get(uuid)
+
+        if expiry is None:
+            return False
+
+        if time.monotonic() >= expiry:
+            self._failed.pop(uuid, None)
+            return False
 
         return True
-    
-    else:
-        return False
 
 
-def is_player_head_saved(uuid: str) -> bool:
+    def _get_path(self, uuid: str) -> str:
+        return os.path.join(self.directory, f"{uuid}.png")
+
+
+    async def fetch(self, uuid: str) -> Union[bytes, None]:
+        """
+        Return the PNG bytes of a player's head render, downloading
+        it if it isn't cached. Concurrent fetches of the same head
+        share one download.
+        """
+
+        uuid = uuids.normalize(uuid)
+
+        if (png := self._get_cached(uuid)) is not None:
+            return png
+
+        if self._has_failed(uuid):
+            return None
+
+        if uuid not in self._downloads:
+            self._downloads[uuid] = asyncio.ensure_future(self._download(uuid))
+
+        return await asyncio.shield(self._downloads[uuid])
+
+
+    async def _download(self, uuid: str) -> Union[bytes, None]:
+        session: aiohttp.ClientSession = self._get_session()
+
+        try:
+            async with session.get(self.URL.format(uuid=uuid)) as response:
+                png: Union[bytes, None] = await response.read() if response.status == 200 else None
+
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            png = None
+
+        finally:
+            self._downloads.pop(uuid, None)
+
+            # a session created for a one-off asyncio.run can't be reused
+            if session is not self._session:
+                await session.close()
+
+        if png is None:
+            self._failed[uuid] = time.monotonic() + self.failure_ttl
+            return None
+
+        with open(self._get_path(uuid), "wb") as f:
+            f.write(png)
+
+        with self._lock:
+            if self._saved is not None:
+                self._saved.add(uuid)
+
+        self._remember(uuid, png)
+
+        return png
+
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(total=self.download_timeout)
+
+        if self._loop is None or asyncio.get_running_loop() is not self._loop:
+            return aiohttp.ClientSession(timeout=timeout)
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=timeout)
+
+        return self._session
+
+
+    async def prefetch(self, uuids: list, concurrency: int = 4) -> None:
+        """
+        Download the heads of every given player that
+        aren't cached yet.
+        """
+
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+
+        async def prefetch_one(uuid: str) -> None:
+            async with semaphore:
+                await self.fetch(uuid)
+
+        await asyncio.gather(*(prefetch_one(uuid) for uuid in uuids))
+
+
+HEAD_SERVICE: PlayerHeadService = PlayerHeadService(file_path)
+
+
+def download_player_head(uuid: str) -> bool:
     """
-    Return whether or not a player's head render
-    is saved or not.
+    Downloads an image of the given player's
+    rendered minecraft head.
+
+    Returns whether file was successfully
+    downloaded or not.
     """
 
-    return f"{uuid}.png" in os.listdir(file_path)
+    return HEAD_SERVICE.get_png(uuid) is not None
 
 
 def get_player_head_file(uuid: str) -> Union[discord.File, None]:
@@ -80,20 +288,13 @@ def get_player_head_file(uuid: str) -> Union[discord.File, None]:
     of the requested player's head rendering.
     """
 
-    result: bool = True
-    
-    if not is_player_head_saved(uuid):
-        result = download_player_head(uuid)
+    png: Union[bytes, None] = HEAD_SERVICE.get_png(uuid)
 
-    if not result:
+    if png is None:
         return None
-    
-    img_file_path = os.path.join(file_path, uuid)
-    img_file_path += ".png"
-    
-    with open(img_file_path, 'rb') as f:
-        head_render: discord.File = discord.File(f, filename="image.png")
-        return head_render
+
+    head_render: discord.File = discord.File(io.BytesIO(png), filename="image.png")
+    return head_render
     
 
 def get_player_head_file_ign(username: str) -> Union[discord.File, None]:
@@ -1,8 +1,10 @@
 # Project imports
 
-from armory import get_config_dict, write_to_config_file
-from data.snapshots import get_player_snapshots
 from embeds import PlayerListOptions, get_players_embed, get_help_embed
+from util.config_store import CONFIG_STORE
+from util.online import ONLINE_CLIENT
+from util.publisher import ChannelNamePublisher
+from util.timing import TIMINGS
 
 
 # Other imports
@@ -13,41 +15,15 @@ from discord import ApplicationContext
 from discord.commands import slash_command
 from discord.ext import commands, tasks
 
-import json
-import requests
+import asyncio
 
-from main import SERVER_IP
-
-def get_players_online() -> list:
+async def get_players_online() -> list:
     """
     Return a list of names of players currently
     online.
     """
 
-    if not SERVER_IP:
-        return []
-
-    API_LINK: str = f"https://api.mcsrvstat.us/2/{SERVER_IP}"
-    players: list = []
-
-    response: dict = requests.get(API_LINK).json()
-
-    # sometimes player list is in "info", sometimes in "players"
-    if resp_info := response.get("info"):
-        if "clean" in resp_info.keys():
-            players = response["info"]["clean"]
-
-    elif resp_info := response.get("players"):
-        if "list" in resp_info.keys():
-            players = resp_info["list"]
-
-    if not players:
-        # no players online
-        return []
-
-    players = [f"{player[:-7]} (In Vault)" if "(vault)" in player else player for player in players]
-
-    return players
+    return await ONLINE_CLIENT.get_players()
 
 
 class Info(commands.Cog):
@@ -59,6 +35,7 @@ class Info(commands.Cog):
 
         self.eternal_guild = None
         self.num_online_vc = None
+        self.num_online_publisher: ChannelNamePublisher = ChannelNamePublisher()
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -69,28 +46,33 @@ class Info(commands.Cog):
         self.eternal_guild = self.bot.get_guild(self.eternal_guild_id)
         if self.eternal_guild:
             self.num_online_vc = self.eternal_guild.get_channel(self.num_online_vc_id)
+            if self.num_online_vc:
+                self.num_online_publisher.attach(self.num_online_vc)
 
             self.update_num_online.start()
 
     def cog_unload(self):
         self.update_num_online.cancel()
+        self.num_online_publisher.cancel()
+        asyncio.create_task(ONLINE_CLIENT.close())
 
     @tasks.loop(seconds=10)
+    @TIMINGS.timed("loop.num_online")
     async def update_num_online(self):
         """
-        Automatically update a voice channel's name every
-        30 seconds with how many players are currently online.
+        Keep a voice channel's name up to date with how
+        many players are currently online. The channel is
+        only renamed when the count changes.
         """
 
-        players: list = get_players_online()
+        players: list = await get_players_online()
         num_players: int = len(players)
 
-        if self.num_online_vc:
-            if num_players == 1:
-                await self.num_online_vc.edit(name=f"{num_players} player online!")
+        if num_players == 1:
+            self.num_online_publisher.publish(f"{num_players} player online!")
 
-            else:
-                await self.num_online_vc.edit(name=f"{num_players} players online!")
+        else:
+            self.num_online_publisher.publish(f"{num_players} players online!")
 
     @slash_command(name="online")
     async def online(self, ctx: ApplicationContext):
@@ -98,7 +80,7 @@ class Info(commands.Cog):
         Display what users are currently online.
         """
 
-        players_online: list = get_players_online()
+        players_online: list = await get_players_online()
         embed: discord.Embed = get_players_embed(PlayerListOptions.ONLINE, players_online)
 
         await ctx.respond(embed=embed)
@@ -109,19 +91,11 @@ class Info(commands.Cog):
         """
         Allow a user to set their MC username.
         """
-        data: dict = get_config_dict()
-
-        if str(ctx.user.id) not in data:
-            data[str(ctx.user.id)] = {
-                "alias": ign,
-                "bounty_alerts": False,
-                "bounty_alert_pings": False
-            }
+        if str(ctx.user.id) not in CONFIG_STORE:
+            CONFIG_STORE.update(str(ctx.user.id), alias=ign, bounty_alerts=False, bounty_alert_pings=False)
 
         else:
-            data[str(ctx.user.id)]["alias"] = ign
-
-        write_to_config_file(data)
+            CONFIG_STORE.update(str(ctx.user.id), alias=ign)
 
         await ctx.respond(
             f"Successfully tied your discord account to Minecraft user `{ign}`!"
@@ -1,3 +1,7 @@
+# Project imports
+from util.watcher import WATCHER
+
+# Other imports
 import discord
 from dotenv import load_dotenv
 
@@ -8,6 +12,30 @@ load_dotenv()
 TESTING = os.getenv("TESTING")
 SERVER_IP = os.getenv("SERVER_IP")
 
+# server status API used to list online players, and how long its results are reused
+SERVER_STATUS_API = os.getenv("SERVER_STATUS_API") or "https://api.mcsrvstat.us/2/"
+ONLINE_CACHE_TTL = float(os.getenv("ONLINE_CACHE_TTL") or 10)
+
+# number of threads running blocking data work, and how long a command waits on it
+DATA_WORKERS = int(os.getenv("DATA_WORKERS") or 4)
+DATA_TIMEOUT = float(os.getenv("DATA_TIMEOUT") or 15)
+
+# whether to download every known player's head when the bot starts
+PREFETCH_HEADS = os.getenv("PREFETCH_HEADS") == "TRUE"
+
+# "sqlite" stores user config in a SQLite database instead of config.json
+CONFIG_BACKEND = os.getenv("CONFIG_BACKEND") or "json"
+
+# seconds player snapshots are trusted before checking the directory again, when the file watcher hasn't reported changes
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE") or 5)
+
+# how many formatted per-player results (black markets, proficiencies, ...) are kept in memory
+VIEW_CACHE_SIZE = int(os.getenv("VIEW_CACHE_SIZE") or 1024)
+
+# whether to time commands and their stages, and where to write the timings for Prometheus
+TIMING_ENABLED = os.getenv("TIMING") == "TRUE"
+TIMING_PROMETHEUS_FILE = os.getenv("TIMING_PROMETHEUS_FILE")
+
 if TESTING == "TRUE" or TESTING == True:
     TOKEN = os.getenv("TEST_TOKEN")
 else:
@@ -15,7 +43,12 @@ else:
 
 
 
-bot = discord.Bot()
+# the members intent lets nickname updates use the member cache instead of
+# fetching every member, but has to be enabled in the Developer Portal first
+intents = discord.Intents.default()
+intents.members = os.getenv("MEMBERS_INTENT") == "TRUE"
+
+bot = discord.Bot(intents=intents)
 
 @bot.event
 async def on_ready():
@@ -25,10 +58,13 @@ async def on_ready():
 
     print(f"{bot.user} has connected to Discord!")
 
+    # start publishing world file changes to the cogs
+    WATCHER.start()
+
 
 if __name__ == "__main__":
 
-    extensions = ['admin', 'armory', 'info', 'tracker']
+    extensions = ['admin', 'armory', 'info', 'server', 'tracker']
 
     for ext in extensions:
         bot.load_extension(ext)
@@ -0,0 +1,96 @@
+# Project imports
+from data.leaderboard import LEADERBOARD, METRICS, format_metric_value
+from data.progression import get_players_without_research, get_research_names
+from data.server_stats import SERVER_STATS
+from embeds import PlayerListOptions, get_leaderboard_embed, get_players_embed, get_server_stats_embed
+from util.errors import report_command_error
+from util.timing import TIMINGS, DISCORD_SEND
+from util.worker import run_blocking
+
+# Other imports
+import discord
+from discord import ApplicationContext
+
+from discord.commands import slash_command, Option
+from discord.ext import commands
+
+from typing import Union
+
+
+async def research_autocomplete(ctx: discord.AutocompleteContext) -> list:
+    """
+    Suggest mods researched by any player.
+    """
+
+    return await run_blocking(get_research_names, ctx.value or "")
+
+
+class Server(commands.Cog):
+    def __init__(self, bot: discord.Bot) -> None:
+        self.bot: discord.Bot = bot
+
+    async def cog_command_error(self, ctx: ApplicationContext, error):
+        """
+        Let the user know when a command fails, or its data took too long to retrieve.
+        """
+
+        await report_command_error(ctx, error)
+
+    @slash_command(name="leaderboard")
+    async def leaderboard(self,
+                          ctx: ApplicationContext,
+                          metric: Option(str, "Choose what to rank players by", choices=[discord.OptionChoice(name, value) for value, name in METRICS.items()]), #type: ignore
+                          page: Option(int, "Page of the leaderboard to view", required=False, default=1, min_value=1)): #type: ignore
+        """
+        Respond with a page of the server's players ranked by a metric.
+        """
+
+        await ctx.defer()
+
+        rows, page_count = await run_blocking(LEADERBOARD.get_page, metric, page)
+        rows = [(rank, name, format_metric_value(metric, value)) for rank, name, value in rows]
+
+        embed: discord.Embed = get_leaderboard_embed(f"{METRICS[metric]} Leaderboard", rows, page, page_count)
+
+        with TIMINGS.span(DISCORD_SEND):
+            await ctx.respond(embed=embed)
+
+    @slash_command(name="server-stats")
+    async def server_stats(self, ctx: ApplicationContext):
+        """
+        Respond with an embed of vault levels, vaults run and
+        proficiencies across every player on the server.
+        """
+
+        await ctx.defer()
+
+        stats: dict = await run_blocking(SERVER_STATS.get_stats)
+        embed: discord.Embed = get_server_stats_embed(stats)
+
+        with TIMINGS.span(DISCORD_SEND):
+            await ctx.respond(embed=embed)
+
+    @slash_command(name="missing-research")
+    async def missing_research(self,
+                               ctx: ApplicationContext,
+                               research: Option(str, "Choose a mod research", autocomplete=research_autocomplete)): #type: ignore
+        """
+        Respond with an embed of every player that hasn't researched a mod yet.
+        """
+
+        await ctx.defer()
+
+        players: Union[list, None] = await run_blocking(get_players_without_research, research)
+
+        if players is None:
+            await ctx.respond(f"Nobody has researched `{research}`!")
+            return
+
+        embed: discord.Embed = get_players_embed(PlayerListOptions.MISSING_RESEARCH, players, research)
+
+        with TIMINGS.span(DISCORD_SEND):
+            await ctx.respond(embed=embed)
+
+
+def setup(bot: discord.Bot) -> None:
+    bot.add_cog(Server(bot))
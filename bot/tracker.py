@@ -1,16 +1,20 @@
-from armory import get_config_dict, write_to_config_file, has_alias_set
+from armory import get_config_dict, has_alias_set
+from data.snapshots import SNAPSHOT_INDEX
+from util.config_store import CONFIG_STORE
+from util.events import BUS, SNAPSHOTS_CHANGED
+from util.timing import TIMINGS
+from util.worker import run_blocking
 
 import discord
 from discord import ApplicationContext
 
-from discord.commands import slash_command, Option
-from discord.ext import commands, tasks
+from discord.commands import slash_command
+from discord.ext import commands
 
-import json
-import os
-from sys import platform
+import asyncio
 
-TESTING = os.getenv("TESTING")
+# seconds between nickname edits, keeping a burst of level ups within rate limits
+NICK_EDIT_INTERVAL: float = 1
 
 
 def get_all_player_stats():
@@ -19,20 +23,39 @@ def get_all_player_stats():
     json data.
     """
 
-    directory: str = "playerSnapshots"
-    files: list = os.listdir(directory)
+    SNAPSHOT_INDEX.refresh()
 
     data: dict = dict()
 
-    for file in files:
-        with open(os.path.join(directory, file)) as f:
+    for _, player_data in SNAPSHOT_INDEX.items():
+        player_name: str = player_data["playerNickname"]
 
-            player_data: dict = json.load(f)
-            player_name: str = player_data["playerNickname"]
-
-            data[player_name] = player_data
+        data[player_name] = player_data
 
     return data
+
+
+def get_level_nick(user_nick: str, vault_level: int) -> str:
+    """
+    Return a nickname with the given vault level
+    appended, replacing any level already in it.
+    """
+
+    pipe_loc: int = user_nick.find(" |")
+
+    # truncate level off nick if already exists
+    if pipe_loc != -1:
+        user_nick = user_nick[:pipe_loc]
+
+    updated_username: str = user_nick + f" | {vault_level}"
+    total_user_len: int = len(updated_username)
+
+    # make sure nick is within 32 chars to be valid discord nick
+    if total_user_len > 32:
+        to_truncate: int = total_user_len - 32
+        updated_username = user_nick[:-to_truncate] + f" | {vault_level}"
+
+    return updated_username
     
 
 class Tracker(commands.Cog):
@@ -42,70 +65,113 @@ class Tracker(commands.Cog):
         self.eternal_guild_id: int = 1064745467663102043
         self.eternal_guild = None
 
+        # discord ID -> vault level last applied to their nickname
+        self.applied_levels: dict = {}
+        self.level_update_lock: asyncio.Lock = asyncio.Lock()
+
+        BUS.subscribe(SNAPSHOTS_CHANGED, self.on_snapshots_changed)
+
 
     @commands.Cog.listener()
     async def on_ready(self):
         """
-        Begin level updating task loop 
+        Bring nicknames up to date once the bot is ready.
         """
 
         self.eternal_guild = self.bot.get_guild(self.eternal_guild_id)
 
-        self.update_player_level_task.start()
+        await self.update_player_levels()
 
     def cog_unload(self):
-        self.update_player_level_task.cancel()
+        BUS.unsubscribe(SNAPSHOTS_CHANGED, self.on_snapshots_changed)
 
 
-    @tasks.loop(seconds=60)
-    async def update_player_level_task(self):
+    async def on_snapshots_changed(self, paths: set):
+        """
+        Update nicknames whenever player snapshots change.
+        """
+
+        await self.update_player_levels()
+
+
+    @TIMINGS.timed("loop.player_levels")
+    async def update_player_levels(self):
         """
         Keep discord usernames up to date with current level
         of players who opt in.
+
+        Only members whose level changed since it was last applied
+        are edited, and edits are spaced out to stay within
+        Discord's rate limits.
         """
 
         if not self.eternal_guild:
             return
 
+        # runs triggered while another is in progress wait for it, then find nothing left to do
+        async with self.level_update_lock:
+            await self._update_player_levels()
+
+    async def _update_player_levels(self):
         config_data: dict = get_config_dict()
-        all_player_stats: dict = get_all_player_stats()
+        all_player_stats: dict = await run_blocking(get_all_player_stats)
+
+        pending_edits: list = []
 
         for discord_id, config in config_data.items():
             
-            if config.get("track_level_nick"):
-                discord_user = await self.eternal_guild.fetch_member(discord_id)
-                mc_username: str = config.get("alias")
-                
-                # move on if failed to retrieve discord user obj
-                if not isinstance(discord_user, discord.Member):
-                    continue
+            if not config.get("track_level_nick"):
+                self.applied_levels.pop(discord_id, None)
+                continue
 
-                # move on if player not stored in all_player_stats
-                if not (player_stats := all_player_stats.get(mc_username)):
-                    continue
+            mc_username: str = config.get("alias")
+
+            # move on if player not stored in all_player_stats
+            if not (player_stats := all_player_stats.get(mc_username)):
+                continue
+
+            # move on if failed to retrieve vault level
+            if not isinstance((vault_level := player_stats.get("vaultLevel")), int):
+                continue
+
+            # move on if level hasn't changed since it was last applied
+            if self.applied_levels.get(discord_id) == vault_level:
+                continue
+
+            # prefer the gateway member cache, only asking the API on a miss
+            discord_user = self.eternal_guild.get_member(int(discord_id)) #type: ignore
+
+            if discord_user is None:
+                try:
+                    discord_user = await self.eternal_guild.fetch_member(int(discord_id)) #type: ignore
 
-                # move on if failed to retrieve vault level
-                if not isinstance((vault_level := player_stats.get("vaultLevel")), int):
+                except discord.HTTPException:
                     continue
 
-                vault_level = str(vault_level)
-                user_nick: str = discord_user.display_name
-                pipe_loc: int = user_nick.find(" |")
+            updated_username: str = get_level_nick(discord_user.display_name, vault_level)
 
-                # truncate level off nick if already exists
-                if pipe_loc != -1:
-                    user_nick = user_nick[:pipe_loc]
+            if updated_username == discord_user.display_name:
+                self.applied_levels[discord_id] = vault_level
+                continue
 
-                updated_username: str = user_nick + f" | {vault_level}"
-                total_user_len: int = len(updated_username)
+            pending_edits.append((discord_id, discord_user, updated_username, vault_level))
 
-                # make sure nick is within 32 chars to be valid discord nick
-                if total_user_len > 32:
-                    to_truncate: int = total_user_len - 32
-                    updated_username = user_nick[:-to_truncate] + f" | {vault_level}"
+        for i, (discord_id, discord_user, updated_username, vault_level) in enumerate(pending_edits):
+            if i:
+                await asyncio.sleep(NICK_EDIT_INTERVAL)
 
+            try:
                 await discord_user.edit(nick=updated_username)
 
+            # bot can't edit this member, so don't keep trying every update
+            except discord.Forbidden:
+                pass
+
+            except discord.HTTPException:
+                continue
+
+            self.applied_levels[discord_id] = vault_level
+
 
     @has_alias_set()
     @slash_command(name="enable-nick-level")
@@ -118,17 +184,14 @@ class Tracker(commands.Cog):
             await ctx.respond("Bots are unable to change owner's nickname!")
             return
 
-        configs: dict = get_config_dict()
-
-        try:
-            configs[str(ctx.user.id)]["track_level_nick"] = enabled #type: ignore
-            write_to_config_file(configs)
-
-        except KeyError:
+        if str(ctx.user.id) not in CONFIG_STORE:
             await ctx.respond("Unable to store config!", ephemeral=True)
             return
-        
+
+        CONFIG_STORE.update(str(ctx.user.id), track_level_nick=enabled)
+
         if enabled:
+            asyncio.create_task(self.update_player_levels())
             choice_str: str = "Your nickname will now be kept up to date with your vault level."
 
         else:
@@ -0,0 +1,225 @@
+# Project imports
+from main import TESTING, CONFIG_BACKEND
+
+# Other imports
+import atexit
+import json
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from sys import platform
+from typing import Union
+
+
+if platform != "win32":
+    if TESTING == False or TESTING == "FALSE":
+        CONFIG_DIRECTORY: str = os.path.join("eternal-smp-bot", "bot")
+    else:
+        CONFIG_DIRECTORY: str = os.path.join("test-eternal-smp-bot", "bot")
+
+else:
+    CONFIG_DIRECTORY: str = os.path.join("bot")
+
+CONFIG_PATH: str = os.path.join(CONFIG_DIRECTORY, "config.json")
+CONFIG_DB_PATH: str = os.path.join(CONFIG_DIRECTORY, "config.db")
+
+
+class JsonConfigBackend():
+    """
+    Stores the whole config as one json file, replaced
+    atomically on every save.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+
+
+    def load(self) -> dict:
+        if not os.path.isfile(self.path):
+            return {}
+
+        with open(self.path, "r") as f:
+            try:
+                return json.load(f)
+
+            except json.JSONDecodeError:
+                return {}
+
+
+    def save(self, data: dict, changed: set) -> None:
+        directory: str = os.path.dirname(self.path) or "."
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".config-", suffix=".json")
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=4)
+
+            # mkstemp creates the file readable only by us, so keep the old file's permissions
+            try:
+                mode: int = stat.S_IMODE(os.stat(self.path).st_mode)
+
+            except FileNotFoundError:
+                mode = 0o644
+
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, self.path)
+
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+class SqliteConfigBackend():
+    """
+    Stores one row per discord user, so a save only
+    writes the users that changed.
+    """
+
+    def __init__(self, path: str, json_path: Union[str, None] = None):
+        self.path: str = path
+        self.json_path: Union[str, None] = json_path
+
+        with self._connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS config (discord_id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+
+    def load(self) -> dict:
+        with self._connect() as connection:
+            rows: list = connection.execute("SELECT discord_id, data FROM config").fetchall()
+
+        # start out with the existing json config when switching backends
+        if not rows and self.json_path:
+            data: dict = JsonConfigBackend(self.json_path).load()
+            self.save(data, set(data))
+
+            return data
+
+        return {discord_id: json.loads(data) for discord_id, data in rows}
+
+
+    def save(self, data: dict, changed: set) -> None:
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO config (discord_id, data) VALUES (?, ?)",
+                [(discord_id, json.dumps(data[discord_id])) for discord_id in changed if discord_id in data]
+            )
+
+
+class ConfigStore():
+    """
+    In-memory store of each discord user's config, like
+    their MC username alias and alert preferences.
+
+    Reads never touch disk. Updates are applied in memory
+    under a lock and persisted by a single background
+    writer, which waits for updates to settle for a moment
+    so a burst of them is written once.
+    """
+
+    def __init__(self, backend, debounce: float = 1):
+        self.backend = backend
+        self.debounce: float = debounce
+
+        self._data: dict = backend.load()
+        self._changed: set = set()
+        self._lock: threading.Lock = threading.Lock()
+        self._save_lock: threading.Lock = threading.Lock()
+        self._dirty: threading.Event = threading.Event()
+
+        self._writer: threading.Thread = threading.Thread(target=self._write_behind, name="config-writer", daemon=True)
+        self._writer.start()
+
+        atexit.register(self.flush)
+
+
+    def __contains__(self, discord_id: str) -> bool:
+        return discord_id in self._data
+
+
+    def get(self, discord_id: str) -> Union[dict, None]:
+        """
+        Return a user's config, which must not be modified.
+        """
+
+        return self._data.get(discord_id)
+
+
+    def get_all(self) -> dict:
+        """
+        Return a snapshot of every user's config, keyed by discord ID.
+
+        Entries are replaced rather than modified on update, so the
+        snapshot stays consistent while it's iterated over.
+        """
+
+        return dict(self._data)
+
+
+    def update(self, discord_id: str, **fields) -> dict:
+        """
+        Set the given fields of a user's config, creating
+        it if it doesn't exist yet. Returns the new config.
+        """
+
+        with self._lock:
+            entry: dict = dict(self._data.get(discord_id, {}))
+            entry.update(fields)
+
+            self._data[discord_id] = entry
+            self._changed.add(discord_id)
+
+        self._dirty.set()
+
+        return entry
+
+
+    def flush(self) -> None:
+        """
+        Write any pending updates to disk now.
+        """
+
+        with self._save_lock:
+            with self._lock:
+                if not self._changed:
+                    return
+
+                data: dict = dict(self._data)
+                changed: set = self._changed
+                self._changed = set()
+
+            try:
+                self.backend.save(data, changed)
+
+            # try again with the next write
+            except Exception:
+                with self._lock:
+                    self._changed |= changed
+
+                raise
+
+
+    def _write_behind(self) -> None:
+        while True:
+            self._dirty.wait()
+            time.sleep(self.debounce)
+            self._dirty.clear()
+
+            try:
+                self.flush()
+
+            except Exception:
+                self._dirty.set()
+
+
+if CONFIG_BACKEND == "sqlite":
+    CONFIG_STORE: ConfigStore = ConfigStore(SqliteConfigBackend(CONFIG_DB_PATH, CONFIG_PATH))
+
+else:
+    CONFIG_STORE: ConfigStore = ConfigStore(JsonConfigBackend(CONFIG_PATH))
@@ -0,0 +1,44 @@
+# Other imports
+import discord
+from discord import ApplicationContext
+
+import asyncio
+import sys
+import traceback
+
+
+def print_command_error(ctx: ApplicationContext, error: Exception) -> None:
+    """
+    Print a command error's traceback the way the bot's default handler does.
+    """
+
+    print(f"Ignoring exception in command {ctx.command}:", file=sys.stderr)
+    traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+
+
+async def report_command_error(ctx: ApplicationContext, error: Exception) -> None:
+    """
+    Let the user know a command failed, and print the traceback of
+    anything other than its data taking too long to retrieve.
+
+    Meant to be called from a cog's cog_command_error, which stops
+    the bot's default handler from printing the traceback itself.
+    Commands with their own error handler are left to it.
+    """
+
+    if ctx.command is not None and ctx.command.has_error_handler():
+        return
+
+    if isinstance(getattr(error, "original", None), asyncio.TimeoutError):
+        message: str = "Retrieving that data took too long! Please try again in a moment."
+
+    else:
+        message = "Something went wrong running that command!"
+        print_command_error(ctx, error)
+
+    try:
+        await ctx.respond(message)
+
+    # the interaction may have expired, or the response already failed
+    except discord.HTTPException:
+        pass
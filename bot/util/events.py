@@ -0,0 +1,58 @@
+# Other imports
+import asyncio
+import traceback
+
+
+# Topics published when watched files change, each with the set of changed paths
+WORLD_DATA_CHANGED: str = "world_data_changed"
+SNAPSHOTS_CHANGED: str = "snapshots_changed"
+VAULT_CONFIG_CHANGED: str = "vault_config_changed"
+
+
+class EventBus():
+    """
+    Minimal in-process publish/subscribe bus. Every subscriber
+    of a topic is run as its own task when the topic is published.
+    """
+
+    def __init__(self):
+        self._subscribers: dict = {}
+        self._tasks: set = set()
+
+
+    def subscribe(self, topic: str, callback) -> None:
+        """
+        Run the coroutine function callback whenever topic is published.
+        """
+
+        self._subscribers.setdefault(topic, []).append(callback)
+
+
+    def unsubscribe(self, topic: str, callback) -> None:
+        if callback in self._subscribers.get(topic, []):
+            self._subscribers[topic].remove(callback)
+
+
+    def publish(self, topic: str, *args) -> None:
+        """
+        Schedule every subscriber of topic with the given arguments.
+        Must be called from the event loop.
+        """
+
+        for callback in list(self._subscribers.get(topic, [])):
+            task: asyncio.Task = asyncio.create_task(self._run(callback, *args))
+
+            # keep a reference so the task isn't garbage collected mid-run
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+
+    async def _run(self, callback, *args) -> None:
+        try:
+            await callback(*args)
+
+        except Exception:
+            traceback.print_exc()
+
+
+BUS: EventBus = EventBus()
@@ -1,10 +1,85 @@
 # Project imports
 import json
-import re
 
 from util.lang import VAULT_LANG_PATH, OTHER_PATH
+from util.timing import TIMINGS, FORMAT_ID
+from util.views import VIEW_CACHE
 
 
+# Parsed lang files, keyed by path
+_json_cache: dict = {}
+
+# Every key of the default lang files, and every dotted suffix of those
+# keys, mapped to the name of the first key it matches
+_default_names: dict = {}
+
+# (object id, alternate files) -> formatted name
+_name_cache: dict = {}
+
+# Incremented whenever the lang files are reloaded, for anything
+# derived from formatted names to use as part of its version
+lang_generation: int = 0
+
+
+
+def load_json(file_path: str) -> dict:
+    """
+    Return the parsed contents of a json file, only reading it from disk
+    the first time it is requested (until reload_lang_files is called).
+    """
+
+    data = _json_cache.get(file_path)
+
+    if data is None:
+        with open(file_path, "r") as f:
+            data = json.load(f)
+
+        _json_cache[file_path] = data
+
+    return data
+
+
+def reload_lang_files() -> None:
+    """
+    Drop every cached lang file, formatted name and player view built
+    from them, so changes to the lang files are picked up on the next lookup.
+    """
+
+    global lang_generation
+
+    _json_cache.clear()
+    _default_names.clear()
+    _name_cache.clear()
+
+    lang_generation += 1
+
+    VIEW_CACHE.clear()
+
+
+def _get_default_names() -> dict:
+    """
+    Return the lookup table built from the default lang files.
+
+    A key such as 'item.minecraft.diamond' is reachable by its full
+    name as well as by 'minecraft.diamond' and 'diamond'. When several
+    keys share a suffix, the first one (in file order) wins.
+    """
+
+    if not _default_names:
+        names: dict = {}
+
+        for file in (VAULT_LANG_PATH, OTHER_PATH):
+            for key, name in load_json(file).items():
+                names.setdefault(key, name)
+
+                segments: list = key.split(".")
+                for i in range(1, len(segments)):
+                    names.setdefault(".".join(segments[i:]), name)
+
+        _default_names.update(names)
+
+    return _default_names
+
 
 def preformat_id(object_id: str) -> str:
     """
@@ -13,6 +88,7 @@ def preformat_id(object_id: str) -> str:
     return object_id.replace(":", ".")
 
 
+@TIMINGS.timed(FORMAT_ID)
 def format_id(object_id: str, alternate_files: list = []) -> str:
     """
     Return the name of an object's id based on given paths
@@ -31,6 +107,25 @@ def format_id(object_id: str, alternate_files: list = []) -> str:
             The path the name corresponding to the id is located in within the file
     """
 
+    cache_key: tuple = (
+        object_id,
+        tuple((file.get("file_path"), file.get("id_path"), file.get("name_path")) for file in alternate_files)
+    )
+
+    if cache_key in _name_cache:
+        return _name_cache[cache_key]
+
+    name: str = _format_id(object_id, alternate_files)
+    _name_cache[cache_key] = name
+
+    return name
+
+
+def _format_id(object_id: str, alternate_files: list) -> str:
+    """
+    Uncached implementation of format_id.
+    """
+
     # Loop through alternate files
     for file in alternate_files:
 
@@ -39,44 +134,28 @@ def format_id(object_id: str, alternate_files: list = []) -> str:
         id_path = file.get("id_path")
         name_path = file.get("name_path") if file.get("name_path") != None else id_path
 
-        with open(file_path, "r") as f:
-
-            data: dict = json.load(f)
-
-            # Retrieve id from id path
-            data_id_path = data
-            for path_child in id_path.split("."):
-                data_id_path = data_id_path[path_child] #type: ignore
-
-            # Check if id exists in id path
-            if object_id in data_id_path:
-            
-                # Retrieve name from name path
-                data_name_path = data
-                if name_path == id_path:
-                    return data_id_path.get(object_id)
-                else:
-                    for path_child in name_path.split(".")[:-1]:
-                        data_name_path = data_name_path[path_child]
-                    return data_name_path.get(name_path.split(".")[-1])
-
-    # Retrieve default paths
-    default_files = [
-        VAULT_LANG_PATH,
-        OTHER_PATH
-    ]
-
-    # Loop through default files
-    for file in default_files:
-
-        with open(file, "r") as f:
-
-            data: dict = json.load(f)
-
-            # Check if id is listed
-            for key in data.keys():
-                if key == object_id or re.findall(f'\.{object_id}$', key):
-                    return data.get(key) #type: ignore
+        data: dict = load_json(file_path)
+
+        # Retrieve id from id path
+        data_id_path = data
+        for path_child in id_path.split("."):
+            data_id_path = data_id_path[path_child] #type: ignore
+
+        # Check if id exists in id path
+        if object_id in data_id_path:
+        
+            # Retrieve name from name path
+            data_name_path = data
+            if name_path == id_path:
+                return data_id_path.get(object_id)
+            else:
+                for path_child in name_path.split(".")[:-1]:
+                    data_name_path = data_name_path[path_child]
+                return data_name_path.get(name_path.split(".")[-1])
+
+    # Check if id is listed in the default files
+    if (name := _get_default_names().get(object_id)) is not None:
+        return name
 
     # Return id (default)
     return object_id
\ No newline at end of file
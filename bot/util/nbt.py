@@ -1,6 +1,386 @@
+# Project imports
+from util.timing import TIMINGS, NBT_PARSE
+
 # Other imports
-import python_nbt.nbt as nbt
+import gzip
+import os
+import threading
+from collections.abc import Mapping, Sequence
+from struct import unpack_from
+
+
+TAG_END         =  0
+TAG_BYTE        =  1
+TAG_SHORT       =  2
+TAG_INT         =  3
+TAG_LONG        =  4
+TAG_FLOAT       =  5
+TAG_DOUBLE      =  6
+TAG_BYTE_ARRAY  =  7
+TAG_STRING      =  8
+TAG_LIST        =  9
+TAG_COMPOUND    = 10
+TAG_INT_ARRAY   = 11
+TAG_LONG_ARRAY  = 12
+
+# struct format and size of fixed size tags, and of typed array elements
+_NUMBER_FORMATS: dict = {
+    TAG_BYTE: ("b", 1),
+    TAG_SHORT: ("h", 2),
+    TAG_INT: ("i", 4),
+    TAG_LONG: ("q", 8),
+    TAG_FLOAT: ("f", 4),
+    TAG_DOUBLE: ("d", 8)
+}
+
+_ARRAY_FORMATS: dict = {
+    TAG_BYTE_ARRAY: ("b", 1),
+    TAG_INT_ARRAY: ("i", 4),
+    TAG_LONG_ARRAY: ("q", 8)
+}
+
+
+# Parsed trees of every .dat file read so far, keyed by path.
+# Each entry is (file version, parsed tree).
+_cache: dict = {}
+_cache_lock: threading.Lock = threading.Lock()
+
+CACHE_STATS: dict = {
+    "hits": 0,
+    "misses": 0,
+    "reparses": 0
+}
+
+
+def _skip(buffer: bytes, tag_type: int, offset: int) -> int:
+    """
+    Return the offset right after the payload of a tag starting at offset,
+    without decoding it.
+    """
+
+    if tag_type in _NUMBER_FORMATS:
+        return offset + _NUMBER_FORMATS[tag_type][1]
+
+    if tag_type == TAG_STRING:
+        return offset + 2 + unpack_from(">H", buffer, offset)[0]
+
+    if tag_type in _ARRAY_FORMATS:
+        return offset + 4 + max(unpack_from(">i", buffer, offset)[0], 0) * _ARRAY_FORMATS[tag_type][1]
+
+    if tag_type == TAG_LIST:
+        element_type: int = buffer[offset]
+        length: int = max(unpack_from(">i", buffer, offset + 1)[0], 0)
+        offset += 5
+
+        if element_type in _NUMBER_FORMATS:
+            return offset + length * _NUMBER_FORMATS[element_type][1]
+
+        for _ in range(length):
+            offset = _skip(buffer, element_type, offset)
+
+        return offset
+
+    if tag_type == TAG_COMPOUND:
+        while True:
+            child_type: int = buffer[offset]
+            offset += 1
+
+            if child_type == TAG_END:
+                return offset
+
+            offset += 2 + unpack_from(">H", buffer, offset)[0]
+            offset = _skip(buffer, child_type, offset)
+
+    raise ValueError(f"Unrecognized tag type {tag_type}")
+
+
+def _decode(buffer: bytes, tag_type: int, offset: int):
+    """
+    Return the tag starting at offset. Compounds and lists are returned
+    as lazy views, which only decode the parts of them that are accessed.
+    """
+
+    if tag_type == TAG_COMPOUND:
+        return LazyCompound(buffer, offset)
+
+    if tag_type == TAG_LIST:
+        return LazyList(buffer, offset)
+
+    if tag_type in _ARRAY_FORMATS:
+        return ArrayTag(buffer, tag_type, offset)
+
+    return Tag(tag_type, _decode_value(buffer, tag_type, offset))
+
+
+def _decode_value(buffer: bytes, tag_type: int, offset: int):
+    if tag_type == TAG_STRING:
+        length: int = unpack_from(">H", buffer, offset)[0]
+        return buffer[offset + 2:offset + 2 + length].decode("utf-8")
+
+    return unpack_from(">" + _NUMBER_FORMATS[tag_type][0], buffer, offset)[0]
+
+
+class Tag():
+    """
+    A decoded number or string tag.
+    """
+
+    __slots__ = ("type_id", "value")
+
+    def __init__(self, type_id: int, value):
+        self.type_id: int = type_id
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"Tag({self.type_id}, {self.value!r})"
+
+
+class ArrayTag():
+    """
+    A byte, int or long array tag, whose elements
+    are unpacked in one go when first accessed.
+    """
+
+    __slots__ = ("type_id", "_buffer", "_offset", "_value")
+
+    def __init__(self, buffer: bytes, type_id: int, offset: int):
+        self.type_id: int = type_id
+        self._buffer: bytes = buffer
+        self._offset: int = offset
+        self._value = None
+
+    @property
+    def value(self) -> list:
+        if self._value is None:
+            length: int = max(unpack_from(">i", self._buffer, self._offset)[0], 0)
+            element_format: str = _ARRAY_FORMATS[self.type_id][0]
+
+            self._value = list(unpack_from(f">{length}{element_format}", self._buffer, self._offset + 4))
+
+        return self._value
+
+
+class LazyCompound(Mapping):
+    """
+    A compound tag that records the offsets of its children when
+    first accessed, and only decodes the children that are looked up.
+    """
+
+    __slots__ = ("_buffer", "_offset", "_children", "_decoded")
+
+    type_id: int = TAG_COMPOUND
+
+    def __init__(self, buffer: bytes, offset: int):
+        self._buffer: bytes = buffer
+        self._offset: int = offset
+        self._children = None
+        self._decoded: dict = {}
+
+    def _index(self) -> dict:
+        if self._children is None:
+            buffer: bytes = self._buffer
+            offset: int = self._offset
+            children: dict = {}
+
+            while True:
+                child_type: int = buffer[offset]
+                offset += 1
+
+                if child_type == TAG_END:
+                    break
+
+                name_length: int = unpack_from(">H", buffer, offset)[0]
+                name: str = buffer[offset + 2:offset + 2 + name_length].decode("utf-8")
+                offset += 2 + name_length
+
+                children[name] = (child_type, offset)
+                offset = _skip(buffer, child_type, offset)
+
+            self._children = children
+
+        return self._children
+
+    def __getitem__(self, name: str):
+        tag = self._decoded.get(name)
+
+        if tag is None:
+            child_type, offset = self._index()[name]
+            tag = _decode(self._buffer, child_type, offset)
+
+            self._decoded[name] = tag
+
+        return tag
+
+    def __iter__(self):
+        return iter(self._index())
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def __contains__(self, name) -> bool:
+        return name in self._index()
+
+    def get_raw(self, name: str) -> bytes:
+        """
+        Return the encoded payload of a child, without decoding it,
+        so callers can tell whether it changed between two files.
+        """
+
+        child_type, offset = self._index()[name]
+
+        return self._buffer[offset:_skip(self._buffer, child_type, offset)]
+
+    @property
+    def value(self) -> "LazyCompound":
+        return self
+
+
+class LazyList(Sequence):
+    """
+    A list tag that only decodes the elements that are accessed.
+
+    Elements of fixed size are located directly from their index,
+    while other elements' offsets are found in one pass the first
+    time any of them is accessed.
+    """
+
+    __slots__ = ("element_type", "_buffer", "_start", "_length", "_offsets", "_items")
+
+    type_id: int = TAG_LIST
+
+    def __init__(self, buffer: bytes, offset: int):
+        self.element_type: int = buffer[offset]
+        self._buffer: bytes = buffer
+        self._start: int = offset + 5
+        self._length: int = max(unpack_from(">i", buffer, offset + 1)[0], 0)
+        self._offsets = None
+        self._items: dict = {}
+
+    def _get_offset(self, index: int) -> int:
+        if self.element_type in _NUMBER_FORMATS:
+            return self._start + index * _NUMBER_FORMATS[self.element_type][1]
+
+        if self._offsets is None:
+            offsets: list = []
+            offset: int = self._start
+
+            for _ in range(self._length):
+                offsets.append(offset)
+                offset = _skip(self._buffer, self.element_type, offset)
+
+            self._offsets = offsets
+
+        return self._offsets[index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+
+        if index < 0:
+            index += self._length
+
+        if not 0 <= index < self._length:
+            raise IndexError("list tag index out of range")
+
+        item = self._items.get(index)
+
+        if item is None:
+            item = _decode(self._buffer, self.element_type, self._get_offset(index))
+            self._items[index] = item
+
+        return item
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def value(self) -> list:
+        return list(self)
+
+    def unpack(self) -> list:
+        """
+        Return the plain values of every element. Lists of numbers are
+        unpacked in one go, without creating a tag per element.
+        """
+
+        if self.element_type in _NUMBER_FORMATS:
+            element_format: str = _NUMBER_FORMATS[self.element_type][0]
+            return list(unpack_from(f">{self._length}{element_format}", self._buffer, self._start))
+
+        if self.element_type == TAG_STRING:
+            return [_decode_value(self._buffer, TAG_STRING, self._get_offset(i)) for i in range(self._length)]
+
+        return [item.value for item in self]
+
+
+def get_file_version(file_path: str) -> tuple:
+    """
+    Return a tuple identifying the current version of a file on disk.
+
+    The tuple changes whenever the file is rewritten, so it can be used
+    to validate anything derived from the file's contents.
+    """
+
+    stat: os.stat_result = os.stat(file_path)
+
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+@TIMINGS.timed(NBT_PARSE)
+def read_lazy_nbt(file_path: str) -> LazyCompound:
+    """
+    Decompress an NBT file and return its root tag, without
+    decoding anything below it until it's accessed.
+    """
+
+    with open(file_path, "rb") as f:
+        buffer: bytes = f.read()
+
+    # world data files are gzipped, but accept uncompressed ones too
+    if buffer[:2] == b"\x1f\x8b":
+        buffer = gzip.decompress(buffer)
+
+    root_type: int = buffer[0]
+    name_length: int = unpack_from(">H", buffer, 1)[0]
+
+    return _decode(buffer, root_type, 3 + name_length)
 
 
 def read_nbt(file_path: str) -> any:
-    return nbt.read_from_nbt_file(file_path)
\ No newline at end of file
+    """
+    Return the parsed NBT tree of a file.
+
+    Trees are cached per path and only re-parsed once the file's
+    mtime, size or inode changes, so the returned tree is shared
+    between callers and must not be modified.
+    """
+
+    version: tuple = get_file_version(file_path)
+
+    with _cache_lock:
+        cached = _cache.get(file_path)
+
+        if cached and cached[0] == version:
+            CACHE_STATS["hits"] += 1
+            return cached[1]
+
+    tree = read_lazy_nbt(file_path)
+
+    with _cache_lock:
+        if cached:
+            CACHE_STATS["reparses"] += 1
+        else:
+            CACHE_STATS["misses"] += 1
+
+        _cache[file_path] = (version, tree)
+
+    return tree
+
+
+def clear_cache() -> None:
+    """
+    Drop every cached tree, forcing the next reads to re-parse.
+    """
+
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,140 @@
+# Project imports
+from main import SERVER_IP, SERVER_STATUS_API, ONLINE_CACHE_TTL
+
+# Other imports
+import aiohttp
+import asyncio
+import time
+from typing import Union
+
+
+# longest wait, in seconds, between requests while the API keeps failing
+MAX_RETRY_INTERVAL: float = 300
+
+
+def parse_players(response: dict) -> list:
+    """
+    Return a list of names of players online from a
+    server status API response.
+    """
+
+    players: list = []
+
+    # sometimes player list is in "info", sometimes in "players"
+    if resp_info := response.get("info"):
+        if "clean" in resp_info.keys():
+            players = response["info"]["clean"]
+
+    elif resp_info := response.get("players"):
+        if "list" in resp_info.keys():
+            players = resp_info["list"]
+
+    if not players:
+        # no players online
+        return []
+
+    players = [f"{player[:-7]} (In Vault)" if "(vault)" in player else player for player in players]
+
+    return players
+
+
+class OnlinePlayersClient():
+    """
+    Asynchronous, cached client for the server status API.
+
+    Results are kept for ttl seconds, and concurrent callers
+    share a single in-flight request. If the API fails, the
+    last successful result keeps being served until a request
+    succeeds again, and the wait before the next request doubles
+    with each consecutive failure, up to MAX_RETRY_INTERVAL.
+    """
+
+    def __init__(self, api_url: str, server_ip: Union[str, None], ttl: float):
+        self.api_url: str = api_url
+        self.server_ip: Union[str, None] = server_ip
+        self.ttl: float = ttl
+
+        self.requests_made: int = 0
+        self.requests_failed: int = 0
+        self.consecutive_failures: int = 0
+
+        self._session: Union[aiohttp.ClientSession, None] = None
+        self._players: Union[list, None] = None
+        self._fetched_at: float = 0
+        self._retry_interval: float = 0
+        self._retry_at: float = 0
+        self._in_flight: Union[asyncio.Task, None] = None
+
+
+    async def get_players(self) -> list:
+        """
+        Return a list of names of players currently online.
+        """
+
+        if not self.server_ip:
+            return []
+
+        now: float = time.monotonic()
+
+        if self._players is not None and now - self._fetched_at < self.ttl:
+            return list(self._players)
+
+        # back off while the API is failing, rather than asking it on every call
+        if now < self._retry_at:
+            return list(self._players) if self._players is not None else []
+
+        if self._in_flight is None:
+            self._in_flight = asyncio.create_task(self._refresh())
+
+        # shielded so one caller being cancelled doesn't cancel the
+        # request every other caller is waiting on
+        return list(await asyncio.shield(self._in_flight))
+
+
+    async def _refresh(self) -> list:
+        try:
+            response: dict = await self._fetch()
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            self.requests_failed += 1
+            self.consecutive_failures += 1
+
+            self._retry_interval = min(self._retry_interval * 2, MAX_RETRY_INTERVAL) if self._retry_interval else max(self.ttl, 1)
+            self._retry_at = time.monotonic() + self._retry_interval
+
+            # serve the stale result while the API is unavailable
+            return self._players if self._players is not None else []
+
+        else:
+            self.consecutive_failures = 0
+            self._retry_interval = 0
+            self._players = parse_players(response)
+            self._fetched_at = time.monotonic()
+
+            return self._players
+
+        finally:
+            self._in_flight = None
+
+
+    async def _fetch(self) -> dict:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+
+        self.requests_made += 1
+
+        async with self._session.get(f"{self.api_url.rstrip('/')}/{self.server_ip}") as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+
+    async def close(self) -> None:
+        """
+        Close the underlying HTTP session.
+        """
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+ONLINE_CLIENT: OnlinePlayersClient = OnlinePlayersClient(SERVER_STATUS_API, SERVER_IP, ONLINE_CACHE_TTL)
@@ -6,11 +6,7 @@ def get_uuid_from_username(username: str):
     Return user's UUID given their username
     """
 
-    player_uuid_dict: dict = get_uuid_username_dict()
-
-    for key, value in player_uuid_dict.items():
-        if value == username:
-            return key
+    return snapshots.SNAPSHOT_INDEX.get_uuid(username)
 
 
 def get_uuid_username_dict() -> dict:
@@ -18,10 +14,10 @@ def get_uuid_username_dict() -> dict:
     Return a dictionary of all UUIDs and their associated players.
     """
 
-    snapshots_list: list = snapshots.get_player_snapshots()
+    snapshots.SNAPSHOT_INDEX.refresh()
     player_uuids: dict = {}
 
-    for snapshot in snapshots_list:
-        player_uuids[snapshot["playerUUID"]] = snapshot["playerNickname"]
+    for uuid, snapshot in snapshots.SNAPSHOT_INDEX.items():
+        player_uuids[uuid] = snapshot["playerNickname"]
 
     return player_uuids
\ No newline at end of file
@@ -0,0 +1,127 @@
+# Other imports
+import discord
+
+import asyncio
+import time
+from collections import deque
+from typing import Union
+
+
+class ChannelNamePublisher():
+    """
+    Keeps a channel's name in sync with the latest published value.
+
+    Discord only allows a couple of channel renames every 10 minutes,
+    so renames are only sent when the name actually changes, rapid
+    changes are coalesced into one edit, and edits wait for room in
+    the rename budget. Whatever value was published last is always
+    the one that ends up applied, unless the bot isn't allowed to
+    rename the channel or it no longer exists.
+    """
+
+    def __init__(self, renames_per_window: int = 2, window: float = 600, settle: float = 5):
+        self.renames_per_window: int = renames_per_window
+        self.window: float = window
+        self.settle: float = settle
+
+        self.edits_made: int = 0
+        self.edits_suppressed: int = 0
+
+        self.channel: Union[discord.abc.GuildChannel, None] = None
+
+        self._applied: Union[str, None] = None
+        self._latest: Union[str, None] = None
+        self._edit_times: deque = deque()
+        self._task: Union[asyncio.Task, None] = None
+
+
+    def attach(self, channel: discord.abc.GuildChannel) -> None:
+        """
+        Set the channel to publish to, treating its current name as applied.
+        """
+
+        self.channel = channel
+        self._applied = channel.name
+        self._latest = channel.name
+
+
+    def publish(self, name: str) -> None:
+        """
+        Request the channel be renamed to name.
+        """
+
+        if self.channel is None:
+            return
+
+        # already applied, or already waiting to be applied
+        if name == self._latest:
+            self.edits_suppressed += 1
+            return
+
+        # a pending value that never got applied is replaced by this one
+        if self._latest != self._applied:
+            self.edits_suppressed += 1
+
+        self._latest = name
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._apply())
+
+
+    def cancel(self) -> None:
+        """
+        Stop applying pending renames.
+        """
+
+        if self._task is not None:
+            self._task.cancel()
+
+
+    async def _apply(self) -> None:
+        while self._latest != self._applied:
+            # give rapid changes time to settle into one rename
+            await asyncio.sleep(self.settle)
+            await self._wait_for_budget()
+
+            name: Union[str, None] = self._latest
+
+            if name == self._applied:
+                break
+
+            # failed attempts count against the budget too, so a
+            # failing channel isn't retried more often than renamed
+            self._edit_times.append(time.monotonic())
+
+            try:
+                await self.channel.edit(name=name) #type: ignore
+
+            # the channel is gone, so stop publishing to it
+            except discord.NotFound:
+                self.channel = None
+                self._latest = self._applied
+                break
+
+            # retrying won't help without the Manage Channels permission, so drop the
+            # pending name, and try again with the next one published
+            except discord.Forbidden:
+                self._latest = self._applied
+                break
+
+            except discord.HTTPException:
+                continue
+
+            self._applied = name
+            self.edits_made += 1
+
+
+    async def _wait_for_budget(self) -> None:
+        while True:
+            now: float = time.monotonic()
+
+            while self._edit_times and now - self._edit_times[0] >= self.window:
+                self._edit_times.popleft()
+
+            if len(self._edit_times) < self.renames_per_window:
+                return
+
+            await asyncio.sleep(self.window - (now - self._edit_times[0]))
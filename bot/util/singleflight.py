@@ -0,0 +1,74 @@
+# Other imports
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight():
+    """
+    Coalesces concurrent calls for the same key, so that when several
+    worker threads ask for the same data at once, only the first one
+    computes it and the rest wait for and share its result (or error).
+
+    Nothing is cached once the call finishes; that's left to the
+    caches the calls themselves go through.
+    """
+
+    def __init__(self):
+        # key -> Future of the call in flight
+        self._in_flight: dict = {}
+        self._lock: threading.Lock = threading.Lock()
+
+        self.calls: int = 0
+        self.executions: int = 0
+        self.coalesced: int = 0
+
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Return func(*args, **kwargs), sharing the result with any
+        other calls made for key while it runs.
+        """
+
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+
+            if future is None:
+                future = self._in_flight[key] = Future()
+                self.executions += 1
+                leader: bool = True
+
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+
+        else:
+            future.set_result(result)
+            return result
+
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight)
+            }
+
+
+SINGLE_FLIGHT: SingleFlight = SingleFlight()
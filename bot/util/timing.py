@@ -0,0 +1,230 @@
+# Project imports
+from main import TIMING_ENABLED
+
+# Other imports
+import bisect
+import contextlib
+import functools
+import inspect
+import os
+import stat
+import tempfile
+import threading
+import time
+from collections import deque
+
+
+# upper bounds, in seconds, of the cumulative buckets exported to Prometheus
+BUCKETS: tuple = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# spans shared across the bot, so reports line up between modules
+SNAPSHOT_READ: str = "stage.snapshot_read"
+NBT_PARSE: str = "stage.nbt_parse"
+BOUNTY_DECODE: str = "stage.bounty_decode"
+FORMAT_ID: str = "stage.format_id"
+HEAD_FETCH: str = "stage.head_fetch"
+EMBED_BUILD: str = "stage.embed_build"
+DISCORD_SEND: str = "stage.discord_send"
+
+
+class RollingHistogram():
+    """
+    Durations recorded under one span name.
+
+    Percentiles are taken over the most recent samples only, so they
+    follow current performance, while the bucket counts and totals
+    cover everything since the bot started, as Prometheus expects.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.samples: deque = deque(maxlen=window)
+        self.bucket_counts: list = [0] * len(BUCKETS)
+        self.count: int = 0
+        self.total: float = 0
+
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+        bucket: int = bisect.bisect_left(BUCKETS, seconds)
+        if bucket < len(BUCKETS):
+            self.bucket_counts[bucket] += 1
+
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0
+
+        ordered: list = sorted(self.samples)
+
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class Timings():
+    """
+    Records how long named spans of work take.
+
+    When disabled, span() hands out one shared no-op context manager and
+    timed() returns functions unchanged, so instrumented code costs next
+    to nothing.
+    """
+
+    def __init__(self, enabled: bool, window: int = 1024):
+        self.enabled: bool = enabled
+        self.window: int = window
+
+        self._histograms: dict = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._disabled_span = contextlib.nullcontext()
+
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram: RollingHistogram = self._histograms.get(name) #type: ignore
+
+            if histogram is None:
+                histogram = self._histograms[name] = RollingHistogram(self.window)
+
+            histogram.record(seconds)
+
+
+    def span(self, name: str):
+        """
+        Return a context manager timing the code inside it under name.
+        """
+
+        if not self.enabled:
+            return self._disabled_span
+
+        return self._span(name)
+
+
+    @contextlib.contextmanager
+    def _span(self, name: str):
+        start: float = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+
+    def timed(self, name: str):
+        """
+        Decorator timing every call of a function or coroutine function under name.
+        """
+
+        def decorator(func):
+            if not self.enabled:
+                return func
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    start: float = time.perf_counter()
+
+                    try:
+                        return await func(*args, **kwargs)
+
+                    finally:
+                        self.record(name, time.perf_counter() - start)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start: float = time.perf_counter()
+
+                try:
+                    return func(*args, **kwargs)
+
+                finally:
+                    self.record(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+
+    def get_report(self) -> list:
+        """
+        Return (name, count, p50, p95, max) rows for every span, with
+        durations in milliseconds over the recent window.
+        """
+
+        with self._lock:
+            rows: list = []
+
+            for name in sorted(self._histograms):
+                histogram: RollingHistogram = self._histograms[name]
+
+                rows.append((
+                    name,
+                    histogram.count,
+                    histogram.percentile(0.5) * 1000,
+                    histogram.percentile(0.95) * 1000,
+                    max(histogram.samples, default=0) * 1000
+                ))
+
+            return rows
+
+
+    def get_prometheus_text(self) -> str:
+        """
+        Return every span as a Prometheus histogram in text exposition format.
+        """
+
+        lines: list = [
+            "# HELP eternal_bot_span_seconds Time spent in commands, loops and their stages.",
+            "# TYPE eternal_bot_span_seconds histogram"
+        ]
+
+        with self._lock:
+            for name in sorted(self._histograms):
+                histogram: RollingHistogram = self._histograms[name]
+                cumulative: int = 0
+
+                for bound, bucket_count in zip(BUCKETS, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'eternal_bot_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+
+                lines.append(f'eternal_bot_span_seconds_bucket{{span="{name}",le="+Inf"}} {histogram.count}')
+                lines.append(f'eternal_bot_span_seconds_sum{{span="{name}"}} {histogram.total}')
+                lines.append(f'eternal_bot_span_seconds_count{{span="{name}"}} {histogram.count}')
+
+        return "\n".join(lines) + "\n"
+
+
+    def write_prometheus_file(self, path: str) -> None:
+        """
+        Atomically replace path with the current Prometheus text, for
+        node_exporter's textfile collector or similar to pick up.
+        """
+
+        directory: str = os.path.dirname(path) or "."
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".timings-", suffix=".prom")
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.get_prometheus_text())
+
+            # mkstemp creates the file readable only by us, which would hide it from
+            # an exporter running as another user, so keep the old file's permissions
+            try:
+                mode: int = stat.S_IMODE(os.stat(path).st_mode)
+
+            except FileNotFoundError:
+                mode = 0o644
+
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, path)
+
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+TIMINGS: Timings = Timings(TIMING_ENABLED)
@@ -0,0 +1,76 @@
+"""
+Conversions between the forms a player UUID takes around the bot:
+
+- int array: four signed 32 bit ints, as stored in NBT IntArray tags
+- int: the 128 bit integer value, used as the canonical dictionary key
+- dashed: "xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx", as used by snapshots and world data strings
+- undashed: 32 lowercase hex digits
+"""
+
+# Other imports
+from functools import lru_cache
+from struct import pack, unpack
+
+
+def from_int_array(int_array) -> int:
+    """
+    Return the integer value of a UUID stored as four signed 32 bit ints.
+    """
+
+    return int.from_bytes(pack(">4i", *int_array), "big")
+
+
+def from_int_arrays(int_arrays: list) -> list:
+    """
+    Return the integer values of many int array UUIDs,
+    packing them all into one buffer.
+    """
+
+    buffer: bytes = pack(f">{4 * len(int_arrays)}i", *(i for int_array in int_arrays for i in int_array))
+
+    return [int.from_bytes(buffer[i:i + 16], "big") for i in range(0, len(buffer), 16)]
+
+
+def to_int_array(value: int) -> tuple:
+    """
+    Return a UUID's integer value as four signed 32 bit ints.
+    """
+
+    return unpack(">4i", value.to_bytes(16, "big"))
+
+
+@lru_cache(maxsize=4096)
+def parse(uuid: str) -> int:
+    """
+    Return the integer value of a dashed or undashed UUID string.
+    """
+
+    return int(uuid.replace("-", ""), 16)
+
+
+@lru_cache(maxsize=4096)
+def to_undashed(value: int) -> str:
+    """
+    Return a UUID's integer value as 32 hex digits.
+    """
+
+    return f"{value:032x}"
+
+
+@lru_cache(maxsize=4096)
+def to_dashed(value: int) -> str:
+    """
+    Return a UUID's integer value in its dashed form.
+    """
+
+    digits: str = to_undashed(value)
+
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+
+
+def normalize(uuid: str) -> str:
+    """
+    Return a dashed or undashed UUID string in its lowercase dashed form.
+    """
+
+    return to_dashed(parse(uuid))
@@ -0,0 +1,87 @@
+# Project imports
+from main import VIEW_CACHE_SIZE
+from util.singleflight import SINGLE_FLIGHT
+
+# Other imports
+import threading
+from collections import OrderedDict
+
+
+class ViewCache():
+    """
+    Fully formatted per-player results (a player's black market,
+    proficiencies, ...), kept until the files they were built from change.
+
+    Entries are keyed by (view kind, player UUID) and store the version
+    vector of their source files; a lookup with a different vector rebuilds
+    the entry in place. Concurrent misses for the same entry share one
+    build. The least recently used entries are evicted once there are
+    more than max_entries. Results are shared between callers and must
+    not be modified.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries: int = max_entries
+
+        # (kind, uuid) -> (versions, result)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+
+    def get(self, kind: str, uuid, versions: tuple, build):
+        """
+        Return the cached result of a view for a player, calling
+        build() to create it if it's missing or out of date.
+        """
+
+        key: tuple = (kind, uuid)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+
+        result = SINGLE_FLIGHT.do(("view", kind, uuid, versions), build)
+
+        with self._lock:
+            self._entries[key] = (versions, result)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return result
+
+
+    def clear(self) -> None:
+        """
+        Drop every view, for when something other than the
+        source files (like lang files) changes their output.
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+VIEW_CACHE: ViewCache = ViewCache(VIEW_CACHE_SIZE)
@@ -0,0 +1,156 @@
+# Project imports
+from util.events import BUS, EventBus, WORLD_DATA_CHANGED, SNAPSHOTS_CHANGED, VAULT_CONFIG_CHANGED
+
+# Other imports
+import asyncio
+import os
+from sys import platform
+from typing import Union
+
+try:
+    from inotify_simple import INotify, flags
+
+except ImportError:
+    INotify = None
+
+
+if platform != "win32":
+    WORLD_DATA_DIRECTORY: str = os.path.join("world", "data")
+
+else:
+    WORLD_DATA_DIRECTORY: str = os.path.join("local", "dats")
+
+# (directory, file extension, topic published when one of its files changes)
+WATCHED_DIRECTORIES: list = [
+    (WORLD_DATA_DIRECTORY, ".dat", WORLD_DATA_CHANGED),
+    ("playerSnapshots", ".json", SNAPSHOTS_CHANGED),
+    (os.path.join("config", "the_vault", "gear_modifiers"), ".json", VAULT_CONFIG_CHANGED)
+]
+
+
+class FileWatcher():
+    """
+    Watches the world data, player snapshot and vault config
+    directories, publishing the paths of changed files onto
+    the event bus.
+
+    Uses inotify when inotify_simple is installed, and
+    otherwise compares file mtimes and sizes every few seconds.
+    Changes are collected for a moment before being published,
+    so a file rewritten in several steps is only reported once.
+    """
+
+    def __init__(self, bus: EventBus, directories: list, poll_interval: float = 2, settle: float = 0.5):
+        self.bus: EventBus = bus
+        self.directories: list = directories
+        self.poll_interval: float = poll_interval
+        self.settle: float = settle
+
+        self._task: Union[asyncio.Task, None] = None
+
+
+    def start(self) -> None:
+        """
+        Start watching, if not already watching.
+        """
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch_inotify() if INotify is not None else self._watch_polling())
+
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+    def _publish(self, changed: dict) -> None:
+        for topic, paths in changed.items():
+            if paths:
+                self.bus.publish(topic, paths)
+
+
+    async def _watch_inotify(self) -> None:
+        inotify = INotify()
+        watches: dict = {}
+
+        mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM | flags.DELETE | flags.CREATE
+
+        for directory, extension, topic in self.directories:
+            if os.path.isdir(directory):
+                watches[inotify.add_watch(directory, mask)] = (directory, extension, topic)
+
+        loop = asyncio.get_running_loop()
+        readable: asyncio.Event = asyncio.Event()
+        loop.add_reader(inotify.fileno(), readable.set)
+
+        try:
+            while True:
+                await readable.wait()
+                await asyncio.sleep(self.settle)
+                readable.clear()
+
+                changed: dict = {}
+
+                for event in inotify.read(timeout=0):
+                    if event.wd not in watches:
+                        continue
+
+                    directory, extension, topic = watches[event.wd]
+
+                    if event.name.endswith(extension):
+                        changed.setdefault(topic, set()).add(os.path.join(directory, event.name))
+
+                self._publish(changed)
+
+        finally:
+            loop.remove_reader(inotify.fileno())
+            inotify.close()
+
+
+    async def _watch_polling(self) -> None:
+        signatures: dict = await asyncio.to_thread(self._scan_all)
+
+        while True:
+            await asyncio.sleep(self.poll_interval)
+
+            current_signatures: dict = await asyncio.to_thread(self._scan_all)
+            changed: dict = {}
+
+            for directory, extension, topic in self.directories:
+                previous: dict = signatures.get(directory, {})
+                current: dict = current_signatures.get(directory, {})
+
+                paths: set = {path for path in previous.keys() | current.keys() if previous.get(path) != current.get(path)}
+
+                if paths:
+                    changed.setdefault(topic, set()).update(paths)
+
+            signatures = current_signatures
+            self._publish(changed)
+
+
+    def _scan_all(self) -> dict:
+        signatures: dict = {}
+
+        for directory, extension, topic in self.directories:
+            signatures[directory] = self._scan(directory, extension)
+
+        return signatures
+
+
+    def _scan(self, directory: str, extension: str) -> dict:
+        signature: dict = {}
+
+        if not os.path.isdir(directory):
+            return signature
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(extension):
+                    stat = entry.stat()
+                    signature[os.path.join(directory, entry.name)] = (stat.st_mtime_ns, stat.st_size)
+
+        return signature
+
+
+WATCHER: FileWatcher = FileWatcher(BUS, WATCHED_DIRECTORIES)
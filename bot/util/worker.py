@@ -0,0 +1,93 @@
+# Project imports
+from main import DATA_WORKERS, DATA_TIMEOUT
+
+# Other imports
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+# Blocking data work (NBT parsing, file reads, head downloads) runs here
+# instead of on the event loop. Threads rather than processes, as results
+# hold discord objects and the data caches live in this process.
+_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=DATA_WORKERS, thread_name_prefix="data")
+_stats_lock: threading.Lock = threading.Lock()
+
+POOL_STATS: dict = {
+    "workers": DATA_WORKERS,
+    "queued": 0,
+    "running": 0,
+    "peak_running": 0,
+    "completed": 0,
+    "timeouts": 0
+}
+
+
+def _run(func, *args, **kwargs):
+    """
+    Run func inside a worker thread, keeping track of pool usage.
+    """
+
+    with _stats_lock:
+        POOL_STATS["queued"] -= 1
+        POOL_STATS["running"] += 1
+        POOL_STATS["peak_running"] = max(POOL_STATS["peak_running"], POOL_STATS["running"])
+
+    try:
+        return func(*args, **kwargs)
+
+    finally:
+        with _stats_lock:
+            POOL_STATS["running"] -= 1
+            POOL_STATS["completed"] += 1
+
+
+def _on_done(future: Future) -> None:
+    """
+    Stop counting a job as queued if it was cancelled before it started,
+    as _run never runs for it.
+    """
+
+    if future.cancelled():
+        with _stats_lock:
+            POOL_STATS["queued"] -= 1
+
+
+async def run_blocking(func, *args, timeout: float = DATA_TIMEOUT, **kwargs):
+    """
+    Run a blocking function in the data worker pool and return its result.
+
+    Raises asyncio.TimeoutError if the result isn't available within
+    timeout seconds. A job still queued by then is cancelled; one that
+    already started still runs to completion, but the caller is no
+    longer kept waiting on it.
+    """
+
+    with _stats_lock:
+        POOL_STATS["queued"] += 1
+
+    executor_future: Future = _executor.submit(functools.partial(_run, func, *args, **kwargs))
+    executor_future.add_done_callback(_on_done)
+
+    # cancelling this future (on timeout, or when the caller is cancelled)
+    # also cancels the job, if it hasn't started yet
+    future: asyncio.Future = asyncio.wrap_future(executor_future)
+
+    try:
+        return await asyncio.wait_for(future, timeout)
+
+    except asyncio.TimeoutError:
+        with _stats_lock:
+            POOL_STATS["timeouts"] += 1
+
+        raise
+
+
+def get_pool_stats() -> dict:
+    """
+    Return a copy of the worker pool usage counters.
+    """
+
+    with _stats_lock:
+        return dict(POOL_STATS)